@@ -1,7 +1,8 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from supabase import create_client, Client
-import fastf1
+from supabase.lib.client_options import ClientOptions
 
 # Load environment variables
 load_dotenv()
@@ -10,20 +11,25 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-# FastF1 cache configuration
-FASTF1_CACHE_DIR = os.getenv("FASTF1_CACHE_DIR", "./fastf1_cache")
-
-# Initialize FastF1 cache
-fastf1.Cache.enable_cache(FASTF1_CACHE_DIR)
+# Timeout (seconds) for PostgREST requests made through the shared client
+SUPABASE_TIMEOUT = int(os.getenv("SUPABASE_TIMEOUT", "10"))
 
+@lru_cache(maxsize=1)
 def get_supabase_client() -> Client:
     """
     Initialize and return a Supabase client
     
+    The client is created once per process and reused on later calls so the
+    underlying HTTP connection pool is kept alive across Streamlit reruns.
+    
     Returns:
         Client: Initialized Supabase client
     """
     if not SUPABASE_URL or not SUPABASE_KEY:
         raise ValueError("Supabase URL and KEY must be set in environment variables")
     
-    return create_client(SUPABASE_URL, SUPABASE_KEY) 
\ No newline at end of file
+    return create_client(
+        SUPABASE_URL,
+        SUPABASE_KEY,
+        options=ClientOptions(postgrest_client_timeout=SUPABASE_TIMEOUT)
+    ) 
\ No newline at end of file
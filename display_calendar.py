@@ -3,14 +3,19 @@
 Script to retrieve and display the Formula 1 race calendar data from Supabase.
 """
 
+import gzip
 import logging
+import os
 import pandas as pd
-import matplotlib.pyplot as plt
+import pyarrow as pa
+from collections import OrderedDict
 from config import get_supabase_client
-from tabulate import tabulate
+from race_cards import STATUS_EMOJI, create_race_card_html
 import streamlit as st
 from datetime import datetime, timedelta
-import json
+from pathlib import Path
+import orjson
+import requests
 
 # Configure logging
 logging.basicConfig(
@@ -19,6 +24,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Columns read from the f1_calendar table by the table and plot views
+CALENDAR_COLUMNS = "round,event_name,country,event_date,circuit_name"
+
+# Shared HTTP session for remote calendar JSON
+HTTP_SESSION = requests.Session()
+
+# Last response for the most recently fetched calendar URLs, oldest evicted first
+REMOTE_CALENDAR_CACHE_SIZE = 4
+_remote_calendar_cache = OrderedDict()
+
+# Arrow schema for the rows returned with CALENDAR_COLUMNS
+CALENDAR_SCHEMA = pa.schema([
+    ('round', pa.int16()),
+    ('event_name', pa.string()),
+    ('country', pa.string()),
+    ('event_date', pa.string()),
+    ('circuit_name', pa.string())
+])
+
+# Maximum number of rows PostgREST returns per request
+SUPABASE_PAGE_SIZE = 1000
+
+# Matplotlib backends that can only render to files (e.g. in CI or over SSH)
+NON_INTERACTIVE_BACKENDS = {"agg", "cairo", "pdf", "pgf", "ps", "svg", "template"}
+
+@st.cache_data(ttl=300, show_spinner=False)  # Cache for 5 minutes
 def get_calendar_from_supabase():
     """
     Retrieve the F1 calendar data from Supabase
@@ -32,10 +63,18 @@ def get_calendar_from_supabase():
         
         # Query the data
         logger.info("Retrieving F1 calendar data")
-        response = supabase.table("f1_calendar").select("*").order("round").execute()
-        
-        # Extract the data from the response
-        calendar_data = response.data
+        calendar_data = []
+        start = 0
+        while True:
+            # Page through the results; PostgREST caps each response at SUPABASE_PAGE_SIZE rows
+            query = supabase.table("f1_calendar").select(CALENDAR_COLUMNS).order("round")
+            response = query.range(start, start + SUPABASE_PAGE_SIZE - 1).execute()
+            
+            # Extract the data from the response
+            calendar_data.extend(response.data)
+            if len(response.data) < SUPABASE_PAGE_SIZE:
+                break
+            start += SUPABASE_PAGE_SIZE
         
         logger.info(f"Retrieved {len(calendar_data)} races from Supabase")
         return calendar_data
@@ -44,36 +83,53 @@ def get_calendar_from_supabase():
         logger.error(f"Error retrieving calendar data from Supabase: {e}")
         raise
 
-def display_calendar_table(calendar_data):
+@st.cache_data(show_spinner=False)
+def calendar_to_dataframe(calendar_data):
     """
-    Display the calendar data in a formatted table
+    Convert the Supabase calendar rows into a typed DataFrame
     
     Args:
         calendar_data (list): List of dictionaries with calendar data
+        
+    Returns:
+        pandas.DataFrame: Arrow-backed calendar data with event_date parsed as datetime
+    """
+    table = pa.Table.from_pylist(calendar_data, schema=CALENDAR_SCHEMA)
+    
+    # Supabase returns DATE columns as ISO strings; Arrow parses them in one cast
+    date_index = table.schema.get_field_index('event_date')
+    table = table.set_column(date_index, 'event_date', table['event_date'].cast(pa.timestamp('ns')))
+    
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+def display_calendar_table(df):
+    """
+    Display the calendar data in a formatted table
+    
+    Args:
+        df (pandas.DataFrame): Calendar DataFrame from calendar_to_dataframe
     """
-    # Convert to DataFrame for easier manipulation
-    df = pd.DataFrame(calendar_data)
+    # Imported here so the Streamlit views don't pay for it at startup
+    from tabulate import tabulate
     
     # Select and rename columns for display
-    display_df = df[['round', 'event_name', 'country', 'event_date', 'circuit_name']]
+    display_df = df[['round', 'event_name', 'country', 'event_date', 'circuit_name']].copy()
     display_df.columns = ['Round', 'Event', 'Country', 'Date', 'Circuit']
+    display_df['Date'] = display_df['Date'].dt.date
     
     # Display as table
     print("\nFormula 1 Race Calendar\n")
     print(tabulate(display_df, headers='keys', tablefmt='pretty', showindex=False))
 
-def display_calendar_plot(calendar_data):
+def display_calendar_plot(df):
     """
     Create a visualization of the race calendar
     
     Args:
-        calendar_data (list): List of dictionaries with calendar data
+        df (pandas.DataFrame): Calendar DataFrame from calendar_to_dataframe
     """
-    # Convert to DataFrame
-    df = pd.DataFrame(calendar_data)
-    
-    # Convert event_date to datetime
-    df['event_date'] = pd.to_datetime(df['event_date'])
+    # Imported here so the Streamlit views don't pay for it at startup
+    import matplotlib.pyplot as plt
     
     # Sort by event date
     df = df.sort_values('event_date')
@@ -88,9 +144,10 @@ def display_calendar_plot(calendar_data):
     plt.plot(df['event_date'], df['country'], 'b-', alpha=0.3)
     
     # Add event names as labels
-    for i, row in df.iterrows():
-        plt.text(row['event_date'], row['country'], f" {row['event_name']}", 
-                 verticalalignment='center')
+    ax = plt.gca()
+    label_rows = df[['event_date', 'country', 'event_name']].to_numpy()
+    for event_date, country, event_name in label_rows:
+        ax.annotate(f" {event_name}", (event_date, country), verticalalignment='center')
     
     # Set title and labels
     plt.title('F1 Race Calendar', fontsize=16)
@@ -105,8 +162,11 @@ def display_calendar_plot(calendar_data):
     plt.savefig('f1_calendar.png')
     logger.info("Calendar visualization saved as 'f1_calendar.png'")
     
-    # Show plot
-    plt.show()
+    # Show plot, unless running headless where plt.show() would only warn
+    if plt.get_backend().lower() in NON_INTERACTIVE_BACKENDS:
+        plt.close()
+    else:
+        plt.show()
 
 def main():
     """Main function to retrieve and display F1 calendar data"""
@@ -114,22 +174,73 @@ def main():
         # Get calendar data from Supabase
         calendar_data = get_calendar_from_supabase()
         
+        # Build the DataFrame once for both views
+        calendar_df = calendar_to_dataframe(calendar_data)
+        
         # Display calendar as a table
-        display_calendar_table(calendar_data)
+        display_calendar_table(calendar_df)
         
         # Create calendar visualization
-        display_calendar_plot(calendar_data)
+        display_calendar_plot(calendar_df)
         
         logger.info("Process completed successfully")
         
     except Exception as e:
         logger.error(f"Error in main process: {e}")
 
+@st.cache_data(ttl=60, show_spinner=False)
+def read_calendar_json(json_path, mtime):
+    """Parse the calendar JSON file; mtime is part of the cache key so edits are picked up"""
+    raw = Path(json_path).read_bytes()
+    if json_path.endswith('.gz'):
+        raw = gzip.decompress(raw)
+    return orjson.loads(raw)
+
+def fetch_calendar_json(url):
+    """
+    Download the calendar JSON over a shared keep-alive session
+    
+    Responses are requested compressed, and the last response for each of the
+    REMOTE_CALENDAR_CACHE_SIZE most recent URLs is kept so later requests can
+    be conditional and reuse it on 304 Not Modified.
+    
+    Args:
+        url (str): URL of the calendar JSON
+        
+    Returns:
+        dict: Parsed calendar data
+    """
+    headers = {'Accept-Encoding': 'gzip, deflate'}
+    cached = _remote_calendar_cache.get(url)
+    if cached:
+        _remote_calendar_cache.move_to_end(url)
+        if cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+    
+    response = HTTP_SESSION.get(url, headers=headers, timeout=10)
+    if response.status_code == 304 and cached:
+        return cached['data']
+    response.raise_for_status()
+    
+    data = orjson.loads(response.content)
+    _remote_calendar_cache[url] = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'data': data
+    }
+    _remote_calendar_cache.move_to_end(url)
+    if len(_remote_calendar_cache) > REMOTE_CALENDAR_CACHE_SIZE:
+        _remote_calendar_cache.popitem(last=False)
+    return data
+
 def load_calendar_data(json_path='calendar_data.json'):
-    """Load the calendar data from the JSON file"""
+    """Load the calendar data from a JSON file (optionally gzipped) or URL"""
     try:
-        with open(json_path, 'r') as f:
-            return json.load(f)
+        if json_path.startswith(('http://', 'https://')):
+            return fetch_calendar_json(json_path)
+        return read_calendar_json(json_path, os.path.getmtime(json_path))
     except Exception as e:
         st.error(f"Error loading calendar data: {e}")
         return None
@@ -167,7 +278,7 @@ def display_calendar_summary(calendar_data):
     
     for i, (status, count) in enumerate(status_counts.items()):
         with status_cols[i]:
-            emoji = {"Completed": "✅", "Ongoing": "🏎️", "Upcoming": "🔜"}.get(status, "❓")
+            emoji = STATUS_EMOJI.get(status, "❓")
             st.metric(f"{emoji} {status}", count)
 
 def display_featured_race(race_data, title, emoji):
@@ -188,85 +299,51 @@ def display_featured_race(race_data, title, emoji):
     </div>
     """, unsafe_allow_html=True)
 
-def create_race_card_html(race):
-    """Create HTML for a race card"""
-    # Determine status color and indicator
-    status_colors = {
-        "Completed": "#4CAF50",  # Green
-        "Ongoing": "#FF9800",    # Orange
-        "Upcoming": "#2196F3"    # Blue
-    }
-    
-    status_color = status_colors.get(race['status'], "#9E9E9E")  # Grey default
-    status_emoji = {"Completed": "✅", "Ongoing": "🏎️", "Upcoming": "🔜"}.get(race['status'], "❓")
-    
-    # Special badge for sprint races
-    sprint_badge = f'<span style="background-color: #F44336; color: white; padding: 2px 6px; border-radius: 4px; font-size: 10px; margin-left: 5px;">SPRINT</span>' if race['is_sprint'] else ''
-    
-    # Winner info if available
-    winner_html = ""
-    if race['status'] == "Completed" and race.get('winner') and race['winner']:
-        winner_html = f"""
-        <div style="margin-top: 8px; font-size: 14px;">
-            <strong>Winner:</strong> {race['winner']['display']}
-        </div>
-        """
-    
-    # Round badge in top-right corner
-    round_badge = f"""
-    <div style="position: absolute; top: 10px; right: 10px; background-color: #333; color: white; 
-                border-radius: 50%; width: 25px; height: 25px; display: flex; align-items: center; 
-                justify-content: center; font-weight: bold;">
-        {race['round']}
-    </div>
+@st.cache_data(show_spinner=False)
+def races_to_dataframe(races):
     """
+    Convert the race dictionaries into a DataFrame for filtering
     
-    # Create the HTML for the card
-    card_html = f"""
-    <div style="position: relative; border-radius: 8px; border-left: 5px solid {status_color}; 
-                padding: 12px; margin-bottom: 10px; background-color: #f8f9fa; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
-        {round_badge}
-        <div style="font-size: 16px; font-weight: bold; margin-bottom: 6px;">
-            {race['name']} {sprint_badge}
-        </div>
-        <div style="font-size: 14px; margin-bottom: 4px;">
-            <strong>Date:</strong> {race['date_formatted']}
-        </div>
-        <div style="font-size: 14px; margin-bottom: 4px;">
-            <strong>Location:</strong> {race['location']}, {race['country']}
-        </div>
-        <div style="display: flex; align-items: center; margin-top: 8px;">
-            <span style="background-color: {status_color}; color: white; padding: 2px 8px; border-radius: 4px; font-size: 12px;">
-                {status_emoji} {race['status']}
-            </span>
-        </div>
-        {winner_html}
-    </div>
+    Args:
+        races (list): Race dictionaries from the calendar data object
+        
+    Returns:
+        pandas.DataFrame: One row per race with a categorical status column
     """
-    return card_html
+    df = pd.DataFrame.from_records(races)
+    if not df.empty:
+        df['status'] = df['status'].astype('category')
+    return df
 
 def display_race_cards(calendar_data, filter_status=None):
     """Display all races as cards with optional filtering by status"""
     if not calendar_data:
         return
     
-    races = calendar_data['races']
+    races_df = races_to_dataframe(calendar_data['races'])
     
     # Apply filter if requested
     if filter_status:
-        races = [race for race in races if race['status'] == filter_status]
+        races_df = races_df[races_df['status'] == filter_status]
     
-    if not races:
+    if races_df.empty:
         st.info("No races match the selected filter.")
         return
     
+    races = races_df.to_dict('records')
+    
     # Define number of columns based on screen size
     columns = st.columns(3)  # Can be adjusted based on screen size
     
-    # Create cards and distribute them among columns
+    # Distribute the cards among columns, then write each column in one call
+    column_cards = [[] for _ in columns]
     for i, race in enumerate(races):
-        with columns[i % len(columns)]:
-            st.markdown(create_race_card_html(race), unsafe_allow_html=True)
+        # Use the card pre-rendered into calendar_data.json when available
+        column_cards[i % len(columns)].append(race.get('card_html') or create_race_card_html(race))
+    
+    for column, cards in zip(columns, column_cards):
+        with column:
+            st.markdown("".join(cards), unsafe_allow_html=True)
 
 def display_f1_calendar(data_path='calendar_data.json'):
     """Main function to display the F1 calendar"""
@@ -3,11 +3,17 @@
 Streamlit web app to display F1 race calendar data.
 """
 
+import html
+import os
 import streamlit as st
 import pandas as pd
-import fastf1
-import json
-from datetime import datetime, timedelta
+import numpy as np
+from f1_data import fetch_f1_calendar
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from datetime import datetime
+from pathlib import Path
 
 # Page configuration
 st.set_page_config(
@@ -20,8 +26,12 @@ st.set_page_config(
     }
 )
 
-# Apply dark theme with minimal custom CSS
-st.markdown("""
+# Dark theme CSS, built once at import. The font is loaded with <link> tags
+# next to the style block so it downloads in parallel with the CSS.
+APP_CSS = """
+<link rel="preconnect" href="https://fonts.googleapis.com">
+<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+<link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Titillium+Web:wght@400;600;700&display=swap">
 <style>
     /* Force dark mode throughout */
     [data-testid="stSidebar"], .stApp, .stApp > header, .stApp > footer {
@@ -41,9 +51,7 @@ st.markdown("""
         color: var(--f1-red) !important;
     }
     
-    /* Add F1 font */
-    @import url('https://fonts.googleapis.com/css2?family=Titillium+Web:wght@400;600;700&display=swap');
-    
+    /* F1 font */
     html, body, h1, h2, h3, p, div {
         font-family: 'Titillium Web', sans-serif !important;
     }
@@ -83,20 +91,35 @@ st.markdown("""
         margin-left: 8px;
     }
     
-    /* Table styling */
+    /* Table styling; the calendar table is static HTML, so its wrapper scrolls */
+    .calendar-table {
+        max-height: 600px;
+        overflow: auto;
+    }
     .dataframe {
         width: 100%;
         color: #FAFAFA !important;
         background-color: var(--f1-dark) !important;
+        border-collapse: collapse;
     }
     .dataframe th {
+        position: sticky;
+        top: 0;
         background-color: var(--f1-gray) !important;
         color: white !important;
         font-weight: bold !important;
+        border: 1px solid #333 !important;
+        padding: 8px;
+        text-align: left !important;
     }
     .dataframe td {
         background-color: var(--f1-dark) !important;
         color: #FAFAFA !important;
+        border: 1px solid #333 !important;
+        padding: 8px;
+    }
+    .dataframe tr:nth-child(even) td {
+        background-color: #1C1C26 !important;
     }
     
     /* Main content area */
@@ -144,85 +167,116 @@ st.markdown("""
         background-color: var(--f1-dark) !important;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Apply dark theme with minimal custom CSS
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # ---------- DATA PROCESSING FUNCTIONS ----------
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def fetch_f1_calendar(year=2024):
-    """Fetch F1 calendar data for the specified year"""
-    try:
-        # Try to get calendar data with ergast backend
-        calendar = fastf1.get_event_schedule(year, backend='ergast')
-        
-        # Check if the returned dataframe is empty
-        if calendar.empty:
-            # Fall back to current year if requested year has no data
-            current_year = datetime.now().year
-            calendar = fastf1.get_event_schedule(current_year, backend='ergast')
-            
-        return calendar
-    except Exception as e:
-        st.error(f"Error fetching F1 calendar: {e}")
-        return pd.DataFrame()  # Return empty DataFrame on error
+# A race weekend runs from 2 days before the race (Friday practice) to a
+# few hours after it, to account for the finish time
+RACE_WEEKEND_BEFORE = pd.Timedelta(days=2)
+RACE_WEEKEND_AFTER = pd.Timedelta(hours=6)
+
+# Number of race results fetched from FastF1 in parallel
+WINNER_FETCH_WORKERS = 8
+
+# Season summaries hold numpy counts, which orjson writes directly
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
 
-def get_race_status(race_date):
-    """Determine the status of a race based on date comparison"""
+def get_race_status(race_date, today=None):
+    """
+    Determine the status of a race based on date comparison
+    
+    Args:
+        race_date: The race date
+        today (pandas.Timestamp, optional): Reference time, defaults to now;
+            pass one shared value when classifying several races
+        
+    Returns:
+        str: "Completed", "Ongoing", "Upcoming" or "Unknown"
+    """
     if race_date is None or pd.isna(race_date):
         return "Unknown"
     
-    try:
-        if not isinstance(race_date, datetime):
-            race_date = pd.to_datetime(race_date)
-        
-        today = datetime.now()
-        
-        # For race weekend consideration
-        race_weekend_start = race_date - timedelta(days=2)
-        race_weekend_end = race_date + timedelta(hours=6)
-        
-        # Mark as completed only on the day after the race (day+1)
-        race_day_plus_one = race_date + timedelta(days=1)
+    race_date = pd.Timestamp(race_date)
+    if today is None:
+        today = pd.Timestamp.now()
+    
+    # Mark as completed only on the day after the race (day+1)
+    if race_date.normalize() < today.normalize():
+        return "Completed"
+    elif race_date - RACE_WEEKEND_BEFORE <= today <= race_date + RACE_WEEKEND_AFTER:
+        return "Ongoing"
+    else:
+        return "Upcoming"
+
+def get_race_statuses(event_dates):
+    """
+    Vectorized get_race_status over a column of race dates
+    
+    Args:
+        event_dates (pandas.Series): Race dates
         
-        if race_date.date() < today.date() and race_day_plus_one.date() <= today.date():
-            return "Completed"
-        elif race_weekend_start <= today <= race_weekend_end:
-            return "Ongoing"
-        else:
-            return "Upcoming"
-    except Exception as e:
-        st.error(f"Error calculating race status: {e}")
-        return "Unknown"
+    Returns:
+        numpy.ndarray: Status string for each race
+    """
+    dates = pd.to_datetime(event_dates)
+    now = pd.Timestamp.now()
+    
+    conditions = [
+        dates.isna(),
+        # Completed only from the day after the race (day+1)
+        dates.dt.normalize() < now.normalize(),
+        # Race weekend runs from 2 days before until a few hours after the race
+        (dates - RACE_WEEKEND_BEFORE <= now) & (now <= dates + RACE_WEEKEND_AFTER)
+    ]
+    
+    return np.select(conditions, ["Unknown", "Completed", "Ongoing"], default="Upcoming")
 
 def get_race_winner(year, race_round):
     """Get the winner of a specific race"""
     try:
-        # Get the race session for this event
-        session = fastf1.get_session(year, race_round, 'Race')
-        # Load the session data - minimal data for speed
-        session.load(laps=False, telemetry=False, weather=False)
-        # Get the results
-        results = session.results
-        
-        if results is not None and not results.empty:
-            # Winner is the driver with position 1
-            winner = results[results['Position'] == 1]
-            if not winner.empty:
-                driver_code = winner.iloc[0]['Abbreviation']
-                team = winner.iloc[0]['TeamName']
-                return {
-                    "driver_code": driver_code,
-                    "driver_name": winner.iloc[0]['FullName'],
-                    "team": team,
-                    "position": "1",
-                    "display": f"{driver_code} ({team})"
-                }
-        
-        return {}
+        return fetch_race_winner(year, race_round)
     except Exception:
         # Silently fail - winner may not be available yet
         return {}
 
+@st.cache_data(ttl=604800, show_spinner=False)  # Cache for 7 days; results don't change
+def fetch_race_winner(year, race_round):
+    """
+    Fetch the winner of a specific race from Ergast
+    
+    Raises when results aren't published yet, so st.cache_data doesn't keep
+    the missing result and the next rerun tries again.
+    """
+    # Ergast returns the classified results directly, without loading a session
+    from fastf1.ergast import Ergast
+    
+    response = Ergast().get_race_results(season=year, round=race_round)
+    
+    if not response.content or response.content[0].empty:
+        raise LookupError(f"No results for {year} round {race_round}")
+    
+    # Results are ordered by finishing position
+    winner = response.content[0].iloc[0]
+    driver_code = winner['driverCode']
+    team = winner['constructorName']
+    return {
+        "driver_code": driver_code,
+        "driver_name": f"{winner['givenName']} {winner['familyName']}",
+        "team": team,
+        "position": "1",
+        "display": f"{driver_code} ({team})"
+    }
+
+def schedule_fingerprint(calendar_df):
+    """Hash the schedule columns that prepare_calendar_data depends on"""
+    return int(pd.util.hash_pandas_object(calendar_df[['EventDate', 'RoundNumber']], index=False).sum())
+
+# Statuses move with the clock, so the prepared data is only reused for an hour
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs={pd.DataFrame: schedule_fingerprint})
 def prepare_calendar_data(calendar_df):
     """
     Prepare calendar data for display
@@ -236,132 +290,212 @@ def prepare_calendar_data(calendar_df):
     if calendar_df.empty:
         return {}
         
-    calendar_data = []
     winners = {}
     year = datetime.now().year  # Use current year for race data
     
     # Add status based on date
-    calendar_df['Status'] = calendar_df['EventDate'].apply(get_race_status)
+    calendar_df['Status'] = get_race_statuses(calendar_df['EventDate'])
     
     # Get winners for completed races
     completed_races = calendar_df[calendar_df['Status'] == 'Completed']
     if not completed_races.empty:
-        for _, race in completed_races.iterrows():
-            try:
-                round_num = race['RoundNumber']
-                winners[round_num] = get_race_winner(year, round_num)
-            except:
-                pass  # Silently skip if winner data is unavailable
-    
-    for _, row in calendar_df.iterrows():
-        event_date = pd.to_datetime(row['EventDate']) if pd.notna(row['EventDate']) else None
-        round_num = int(row['RoundNumber']) if pd.notna(row['RoundNumber']) else None
-        
-        event_data = {
-            "round": round_num,
-            "name": row["EventName"],
-            "official_name": row["OfficialEventName"],
-            "country": row["Country"],
-            "location": row["Location"],
-            "circuit": row["CircuitName"] if "CircuitName" in row else row["Location"],
-            "date": event_date.strftime('%Y-%m-%d') if event_date else None,
-            "date_formatted": event_date.strftime('%d %b %Y') if event_date else "TBA",
-            "status": row["Status"],
-            "format": row["EventFormat"],
-            "is_sprint": row["EventFormat"] == 'sprint_qualifying',
-            "winner": winners.get(round_num, {})
-        }
+        # Session loads are I/O bound, so fetch them concurrently
+        rounds = completed_races['RoundNumber'].astype(int).tolist()
+        with ThreadPoolExecutor(max_workers=WINNER_FETCH_WORKERS) as executor:
+            winners = dict(zip(rounds, executor.map(lambda round_num: get_race_winner(year, round_num), rounds)))
+    
+    # Build every field column-wise, then emit one dict per race
+    event_dates = pd.to_datetime(calendar_df['EventDate'])
+    columns = pd.DataFrame({
+        "round": calendar_df['RoundNumber'].astype('Int64'),
+        "name": calendar_df['EventName'],
+        "official_name": calendar_df['OfficialEventName'],
+        "country": calendar_df['Country'],
+        "location": calendar_df['Location'],
+        "circuit": calendar_df['CircuitName'] if 'CircuitName' in calendar_df.columns else calendar_df['Location'],
+        "date": event_dates.dt.strftime('%Y-%m-%d'),
+        "date_formatted": event_dates.dt.strftime('%d %b %Y').fillna("TBA"),
+        "status": calendar_df['Status'],
+        "format": calendar_df['EventFormat'],
+        "is_sprint": calendar_df['EventFormat'] == 'sprint_qualifying'
+    })
+    
+    # Missing values become None so the records stay JSON serializable
+    columns = columns.astype(object).where(columns.notna(), None)
+    calendar_data = [
+        {**event_data, "winner": winners.get(event_data["round"], {})}
+        for event_data in columns.to_dict(orient='records')
+    ]
+    
+    # Pick out sprint and featured races in a single pass over the race list
+    sprint_races = []
+    next_race = None
+    ongoing_race = None
+    last_completed_race = None
+    for race in calendar_data:
+        if race["is_sprint"]:
+            sprint_races.append(race)
         
-        calendar_data.append(event_data)
+        status = race["status"]
+        if status == "Upcoming" and next_race is None:
+            next_race = race
+        elif status == "Ongoing" and ongoing_race is None:
+            ongoing_race = race
+        elif status == "Completed" and (last_completed_race is None or race["round"] > last_completed_race["round"]):
+            last_completed_race = race
+    
+    # Season summaries, each from a single pass over its column
+    first_date, last_date = calendar_df['EventDate'].agg(['min', 'max'])
+    format_counts = calendar_df['EventFormat'].value_counts()
     
     # Create the full data object structure
     result = {
         "season": {
             "year": year,
-            "total_races": len(calendar_df[calendar_df['RoundNumber'] > 0]),
-            "first_race_date": calendar_df['EventDate'].min().strftime('%Y-%m-%d') if not calendar_df.empty else None,
-            "last_race_date": calendar_df['EventDate'].max().strftime('%Y-%m-%d') if not calendar_df.empty else None,
-            "season_span": f"{calendar_df['EventDate'].min().strftime('%d %b %Y')} - {calendar_df['EventDate'].max().strftime('%d %b %Y')}" if not calendar_df.empty else "TBA",
+            "total_races": (calendar_df['RoundNumber'] > 0).sum(),
+            "first_race_date": first_date.strftime('%Y-%m-%d'),
+            "last_race_date": last_date.strftime('%Y-%m-%d'),
+            "season_span": f"{first_date.strftime('%d %b %Y')} - {last_date.strftime('%d %b %Y')}",
             "status_summary": calendar_df['Status'].value_counts().to_dict(),
             "format_summary": {
-                "conventional": len(calendar_df[calendar_df['EventFormat'] == 'conventional']),
-                "sprint_qualifying": len(calendar_df[calendar_df['EventFormat'] == 'sprint_qualifying'])
+                "conventional": format_counts.get('conventional', 0),
+                "sprint_qualifying": format_counts.get('sprint_qualifying', 0)
             }
         },
         "races": calendar_data,
-        "sprint_races": [race for race in calendar_data if race["is_sprint"]],
-        "next_race": next((race for race in calendar_data if race["status"] == "Upcoming"), None),
-        "ongoing_race": next((race for race in calendar_data if race["status"] == "Ongoing"), None),
-        "last_completed_race": next((race for race in sorted(calendar_data, key=lambda x: -x["round"]) if race["status"] == "Completed"), None),
+        "sprint_races": sprint_races,
+        "next_race": next_race,
+        "ongoing_race": ongoing_race,
+        "last_completed_race": last_completed_race,
         "last_updated": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }
     
     # Save to JSON for potential use by other components
-    with open("calendar_data.json", "w") as f:
-        json.dump(result, f, indent=2)
+    write_calendar_json(result)
     
     return result
 
+def write_calendar_json(result, json_path="calendar_data.json"):
+    """
+    Save the calendar data object to disk if its contents changed
+    
+    last_updated is ignored when comparing against the existing file, so it is
+    only rewritten when the calendar itself changes. The write goes through a
+    temporary file so readers never see a partially written JSON document.
+    
+    Args:
+        result (dict): Structured calendar data object
+        json_path (str): Destination file
+    """
+    # Compare with the file itself: it is shared by every session, and this runs
+    # inside cached functions where per-session state doesn't belong
+    content = orjson.dumps(
+        {key: value for key, value in result.items() if key != "last_updated"},
+        option=JSON_OPTIONS | orjson.OPT_SORT_KEYS
+    )
+    try:
+        previous = orjson.loads(Path(json_path).read_bytes())
+        previous.pop("last_updated", None)
+        if orjson.dumps(previous, option=orjson.OPT_SORT_KEYS) == content:
+            return
+    except (OSError, orjson.JSONDecodeError):
+        pass
+    
+    tmp_path = f"{json_path}.tmp"
+    Path(tmp_path).write_bytes(orjson.dumps(result, option=JSON_OPTIONS))
+    os.replace(tmp_path, json_path)
+
 # ---------- UI COMPONENTS ----------
 
+# Race statuses in display order
+RACE_STATUSES = ["Upcoming", "Ongoing", "Completed", "Unknown"]
+
+# Status cell HTML for the calendar table; only four values, so render them once
+STATUS_CELL_STYLES = {
+    "Completed": "background-color: #4CAF5055; color: white",
+    "Ongoing": "background-color: #2196F355; color: white",
+    "Upcoming": "background-color: #FF180155; color: white"
+}
+STATUS_CELL_HTML = {
+    status: f'<span style="{STATUS_CELL_STYLES.get(status, "")}">{status}</span>'
+    for status in RACE_STATUSES
+}
+
+# Race fields shown in the calendar table, mapped to their column headers
+CALENDAR_TABLE_COLUMNS = {
+    'round': 'Round',
+    'name': 'Race Name',
+    'circuit': 'Circuit',
+    'location': 'Location',
+    'country': 'Country',
+    'date_formatted': 'Date',
+    'status': 'Status',
+    'is_sprint': 'Sprint',
+    'winner': 'Winner'
+}
+
+# Featured race card, emitted in a single st.markdown call per race
+FEATURED_TITLE_COLORS = {
+    "Completed": "green",
+    "Ongoing": "blue",
+    "Upcoming": "red"
+}
+FEATURED_RACE_TEMPLATE = (
+    "<div class='race-card'>"
+    "<h3 style='color:{title_color};'>{emoji} {title}</h3>"
+    "<h4>Round {round}: {name}</h4>"
+    "<p><strong>Date:</strong> {date_formatted}<br>"
+    "<strong>Circuit:</strong> {circuit}<br>"
+    "<strong>Location:</strong> {location}, {country}</p>"
+    "{winner_html}{countdown_html}"
+    "<div style='display:flex; align-items:center;'>"
+    "<span class='badge badge-{status_class}'>{status}</span>{sprint_html}"
+    "</div>"
+    "</div>"
+)
+
+@lru_cache(maxsize=32)
+def render_featured_race(title, emoji, round_num, name, date_formatted, circuit,
+                         location, country, status, is_sprint, winner_display, days_until):
+    """Build the HTML for a featured race card; cached on the fields it shows"""
+    return FEATURED_RACE_TEMPLATE.format(
+        title_color=FEATURED_TITLE_COLORS.get(status, "white"),
+        emoji=emoji,
+        title=title,
+        round=round_num,
+        name=name,
+        date_formatted=date_formatted,
+        circuit=circuit,
+        location=location,
+        country=country,
+        winner_html=f"<p><strong>Winner:</strong> {winner_display}</p>" if winner_display else "",
+        countdown_html=f"<p>⏱️ Countdown: {days_until} days</p>" if days_until is not None else "",
+        status_class=status.lower(),
+        status=status,
+        sprint_html="<span class='badge badge-sprint'>SPRINT</span>" if is_sprint else ""
+    )
+
 def display_featured_race(race, title, emoji):
-    """Display a featured race in a card using the simplest possible approach"""
+    """Display a featured race as a single HTML card"""
     if not race:
         return st.info(f"{emoji} No {title.lower()} race available")
     
-    # Create a simple container with a border
-    with st.container():
-        # Title with emoji and colored by status
-        color_map = {
-            "Completed": "green",
-            "Ongoing": "blue",
-            "Upcoming": "red"
-        }
-        title_color = color_map.get(race['status'], "white")
-        
-        # Title
-        st.markdown(f"<h3 style='color:{title_color};'>{emoji} {title}</h3>", unsafe_allow_html=True)
-        
-        # Race name and round
-        st.subheader(f"Round {race['round']}: {race['name']}")
-        
-        # Basic info
-        st.markdown(f"**Date:** {race['date_formatted']}")
-        st.markdown(f"**Circuit:** {race['circuit']}")
-        st.markdown(f"**Location:** {race['location']}, {race['country']}")
-        
-        # Winner info if completed
-        if race['status'] == 'Completed' and race.get('winner'):
-            st.markdown(f"**Winner:** {race['winner'].get('display', '')}")
-            
-        # Show countdown for upcoming races
-        if race['status'] == 'Upcoming':
-            race_date = datetime.strptime(race['date'], '%Y-%m-%d') if race['date'] else None
-            today = datetime.now()
-            if race_date:
-                days_until = (race_date - today).days
-                st.info(f"⏱️ Countdown: {days_until} days")
-        
-        # Status badge
-        status_style = {
-            "Completed": "success",
-            "Ongoing": "primary", 
-            "Upcoming": "danger"
-        }
-        badge_style = status_style.get(race['status'], "secondary")
-        
-        # Simple badges
-        cols = st.columns([1, 1, 3])
-        with cols[0]:
-            st.markdown(f"<span style='background-color:{title_color}; color:white; padding:5px; border-radius:5px;'>{race['status']}</span>", unsafe_allow_html=True)
-        
-        # Sprint badge if applicable
-        if race['is_sprint']:
-            with cols[1]:
-                st.markdown("<span style='background-color:orange; color:white; padding:5px; border-radius:5px;'>SPRINT</span>", unsafe_allow_html=True)
-        
-        # Separator
-        st.markdown("---")
+    # Winner info if completed
+    winner_display = None
+    if race['status'] == 'Completed' and race.get('winner'):
+        winner_display = race['winner'].get('display', '')
+    
+    # Show countdown for upcoming races
+    days_until = None
+    if race['status'] == 'Upcoming' and race['date']:
+        days_until = (datetime.strptime(race['date'], '%Y-%m-%d') - datetime.now()).days
+    
+    card_html = render_featured_race(
+        title, emoji, race['round'], race['name'], race['date_formatted'], race['circuit'],
+        race['location'], race['country'], race['status'], bool(race['is_sprint']),
+        winner_display, days_until
+    )
+    st.markdown(card_html, unsafe_allow_html=True)
 
 def display_season_overview(calendar_data):
     """Display season overview statistics"""
@@ -392,48 +526,57 @@ def display_season_overview(calendar_data):
     </div>
     """, unsafe_allow_html=True)
 
+@st.cache_data(show_spinner=False)
 def create_calendar_table(races):
     """Create a styled DataFrame for the race calendar"""
     # Filter out testing events and create a clean DataFrame
     filtered_races = [race for race in races if race['round'] > 0]
     
-    # Create DataFrame with selected columns
-    df = pd.DataFrame(filtered_races)
-    
-    if df.empty:
+    if not filtered_races:
         return pd.DataFrame()
     
-    # Select and rename columns for display
-    display_df = df[['round', 'name', 'circuit', 'location', 'country', 'date_formatted', 'status', 'is_sprint']]
-    display_df = display_df.rename(columns={
-        'round': 'Round',
-        'name': 'Race Name',
-        'circuit': 'Circuit',
-        'location': 'Location',
-        'country': 'Country',
-        'date_formatted': 'Date',
-        'status': 'Status',
-        'is_sprint': 'Sprint'
-    })
-    
-    # Convert boolean to Yes/No
-    display_df['Sprint'] = display_df['Sprint'].map({True: 'Yes', False: 'No'})
+    # Create DataFrame with only the columns shown in the table
+    display_df = pd.DataFrame.from_records(filtered_races, columns=list(CALENDAR_TABLE_COLUMNS))
     
     # Add winner information for completed races
-    winner_info = []
-    for _, race in df.iterrows():
-        if race['status'] == 'Completed' and race.get('winner'):
-            winner_info.append(race['winner'].get('display', '-'))
-        else:
-            winner_info.append('-')
+    display_df['winner'] = [
+        winner.get('display', '-') if status == 'Completed' and winner else '-'
+        for status, winner in zip(display_df['status'], display_df['winner'])
+    ]
+    
+    # Convert boolean to Yes/No
+    display_df['is_sprint'] = np.where(display_df['is_sprint'], 'Yes', 'No')
     
-    display_df['Winner'] = winner_info
+    # Low-cardinality columns are categorical so filtering and styling compare codes
+    display_df = display_df.rename(columns=CALENDAR_TABLE_COLUMNS).astype({
+        'Status': pd.CategoricalDtype(RACE_STATUSES),
+        'Country': 'category',
+        'Sprint': 'category'
+    })
     
     # Sort by round number
     display_df = display_df.sort_values('Round')
     
     return display_df
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_f1_calendar(year):
+    """
+    Fetch the season schedule through the shared FastF1 helper
+    
+    Args:
+        year (int): The year to fetch the calendar for
+        
+    Returns:
+        pandas.DataFrame: The race calendar data
+    """
+    calendar_df = fetch_f1_calendar(year=year, backend='ergast')
+    
+    # Raise rather than return so a failed or empty fetch isn't cached for the TTL
+    if calendar_df is None or calendar_df.empty:
+        raise LookupError(f"no calendar could be fetched for {year}")
+    return calendar_df
+
 # ---------- MAIN APP ----------
 
 def main():
@@ -443,11 +586,11 @@ def main():
     # Fetch and process calendar data - use current year
     with st.spinner("Loading F1 calendar data..."):
         current_year = datetime.now().year
-        calendar_df = fetch_f1_calendar(year=current_year)
-    
-    if calendar_df.empty:
-        st.error("No calendar data available. Please try again later.")
-        return
+        try:
+            calendar_df = load_f1_calendar(current_year)
+        except Exception as e:
+            st.error(f"Error fetching F1 calendar: {e}")
+            return
     
     # Process calendar data
     calendar_data = prepare_calendar_data(calendar_df)
@@ -472,33 +615,29 @@ def main():
     # Full race calendar as a table
     st.header("Full Race Calendar")
     
-    # Create table
-    calendar_table = create_calendar_table(calendar_data['races'])
-    
     # Add filter
     filter_options = ["All Races", "Upcoming", "Ongoing", "Completed"]
     filter_choice = st.selectbox("Filter races by status:", filter_options)
     
-    # Apply filter
+    # Apply filter before building the table so only visible rows are processed
+    races = calendar_data['races']
     if filter_choice != "All Races":
-        calendar_table = calendar_table[calendar_table['Status'] == filter_choice]
+        races = [race for race in races if race['status'] == filter_choice]
+    
+    # Create table
+    calendar_table = create_calendar_table(races)
     
     if calendar_table.empty:
         st.warning(f"No races with status '{filter_choice}' found.")
     else:
-        # Style the table with colored status indicators
-        def highlight_status(val):
-            if val == 'Completed':
-                return 'background-color: #4CAF5055; color: white'
-            elif val == 'Ongoing':
-                return 'background-color: #2196F355; color: white'
-            elif val == 'Upcoming':
-                return 'background-color: #FF180155; color: white'
-            return ''
-        
-        # Apply styling and display table
-        styled_table = calendar_table.style.map(highlight_status, subset=['Status'])
-        st.dataframe(styled_table, use_container_width=True)
+        # Swap each status for its pre-rendered colored cell; every other column
+        # is escaped, since the table is rendered with escape=False
+        table_cells = pd.DataFrame({
+            column: values.map(STATUS_CELL_HTML) if column == 'Status' else values.astype(str).map(html.escape)
+            for column, values in calendar_table.items()
+        })
+        html_table = table_cells.to_html(index=False, escape=False)
+        st.markdown(f'<div class="calendar-table">{html_table}</div>', unsafe_allow_html=True)
     
     # Footer
     st.markdown("---")
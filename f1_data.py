@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+FastF1 setup and calendar helpers shared by the data ingestion scripts
+and the ECharts calendar app.
+"""
+
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+from functools import lru_cache
+import pandas as pd
+from dotenv import load_dotenv
+
+# Load environment variables; kept apart from config so scripts that never
+# touch Supabase don't need the Supabase client installed
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# FastF1 cache configuration (enabled on demand by get_fastf1); defaults to
+# RAM-backed /dev/shm where available, e.g. not on Windows or Streamlit Cloud
+DEFAULT_CACHE_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+FASTF1_CACHE_DIR = os.getenv("FASTF1_CACHE_DIR", os.path.join(DEFAULT_CACHE_ROOT, "fastf1"))
+
+# Session names for the Session1..Session5 columns of the schedule
+SESSION_NAMES = ["Practice 1", "Practice 2", "Practice 3", "Qualifying", "Race"]
+
+# How long a fetched schedule is reused; the ECharts app is a long-running
+# server and an unpublished season must not stay empty once it's released
+SCHEDULE_CACHE_SECONDS = 3600
+
+@lru_cache(maxsize=1)
+def get_fastf1():
+    """
+    Import FastF1 and enable its on-disk cache
+    
+    FastF1 is imported lazily so modules that only talk to Supabase don't pay
+    for the import or create the cache directory.
+    
+    Returns:
+        module: The fastf1 module with caching enabled
+    """
+    import fastf1
+    
+    # FastF1 refuses to use a cache directory that doesn't exist yet
+    os.makedirs(FASTF1_CACHE_DIR, exist_ok=True)
+    fastf1.Cache.enable_cache(FASTF1_CACHE_DIR)
+    return fastf1
+
+@lru_cache(maxsize=4)
+def _load_event_schedule(year, backend, time_bucket):
+    """Fetch one season's schedule from FastF1, memoized per time bucket; errors are raised, not cached"""
+    return get_fastf1().get_event_schedule(year, backend=backend)
+
+def fetch_f1_calendar(year=2025, backend=None):
+    """
+    Fetch the Formula 1 race calendar for the specified year
+    
+    Falls back to the current year's calendar when the requested year can't
+    be fetched or has no events yet. Schedules are reused for up to
+    SCHEDULE_CACHE_SECONDS per (year, backend), so the fallback and repeated
+    calls don't refetch while new or empty schedules are still picked up.
+    
+    Args:
+        year (int): The year to fetch the calendar for
+        backend (str, optional): FastF1 schedule backend, e.g. 'ergast'
+    
+    Returns:
+        pandas.DataFrame: The race calendar data, or None if nothing could
+            be fetched
+    """
+    time_bucket = int(time.time() // SCHEDULE_CACHE_SECONDS)
+    try:
+        logger.info(f"Fetching F1 calendar for {year}")
+        try:
+            calendar = _load_event_schedule(year, backend, time_bucket)
+            if calendar.empty:
+                raise ValueError(f"no events published for {year}")
+            logger.info(f"Successfully fetched calendar for {year}")
+        except Exception as e:
+            logger.warning(f"Could not fetch {year} calendar: {e}")
+    
+            # Try to get the most recent available calendar instead
+            current_year = datetime.now().year
+            calendar = _load_event_schedule(current_year, backend, time_bucket)
+            logger.info(f"Using {current_year} calendar as fallback")
+    
+        # Callers get their own copy so they can add columns freely
+        return calendar.copy()
+    
+    except Exception as e:
+        logger.error(f"Error fetching F1 calendar: {e}")
+        return None
+
+def to_isoformat(values):
+    """Convert a column of timestamps to ISO 8601 strings, leaving missing values empty"""
+    return values.map(lambda value: value.isoformat(), na_action='ignore')
+
+def prepare_calendar_data(calendar_df):
+    """
+    Prepare calendar data for storage in Supabase or display
+    
+    Args:
+        calendar_df (pandas.DataFrame): The raw calendar DataFrame
+    
+    Returns:
+        list: A list of dictionaries with formatted calendar data
+    """
+    # Build every field column-wise, then emit one dict per race
+    columns = {
+        "event_name": calendar_df["EventName"],
+        "round": calendar_df["RoundNumber"].astype('Int64'),
+        "country": calendar_df["Country"],
+        "location": calendar_df["Location"],
+        "circuit_name": calendar_df["OfficialEventName"],
+        "event_date": to_isoformat(calendar_df["EventDate"]),
+        "event_format": calendar_df["EventFormat"],
+    }
+    for number, session_name in enumerate(SESSION_NAMES, start=1):
+        columns[f"session{number}_name"] = session_name
+        columns[f"session{number}_date"] = to_isoformat(calendar_df[f"Session{number}Date"])
+    
+    records_df = pd.DataFrame(columns)
+    
+    # Missing values become None so the records stay JSON serializable
+    records_df = records_df.astype(object).where(records_df.notna(), None)
+    return records_df.to_dict(orient='records')
\ No newline at end of file
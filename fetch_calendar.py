@@ -4,11 +4,11 @@ Script to fetch Formula 1 race calendar data using FastF1 API
 and store it in Supabase database.
 """
 
-import fastf1
-import pandas as pd
-from datetime import datetime
 import logging
+from datetime import datetime, timezone
+from itertools import islice
 from config import get_supabase_client
+from f1_data import fetch_f1_calendar, prepare_calendar_data
 import time
 
 # Configure logging
@@ -18,102 +18,47 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def fetch_f1_calendar(year=2025):
-    """
-    Fetch the Formula 1 race calendar for the specified year
-    
-    Args:
-        year (int): The year to fetch the calendar for
-        
-    Returns:
-        pandas.DataFrame: The race calendar data
-    """
-    try:
-        logger.info(f"Fetching F1 calendar for {year}")
-        
-        # Note: As of now, FastF1 might not have 2025 data available yet
-        # This will fetch the most recent available calendar
-        # We'll use a try-except block to handle potential errors
-        
-        try:
-            calendar = fastf1.get_event_schedule(year)
-            logger.info(f"Successfully fetched calendar for {year}")
-        except Exception as e:
-            logger.warning(f"Could not fetch {year} calendar: {e}")
-            logger.info("Fetching most recent available calendar instead")
-            
-            # Try to get the most recent available calendar (e.g., 2024)
-            current_year = datetime.now().year
-            calendar = fastf1.get_event_schedule(current_year)
-            logger.info(f"Using {current_year} calendar as fallback")
-        
-        return calendar
-    
-    except Exception as e:
-        logger.error(f"Error fetching F1 calendar: {e}")
-        raise
-
-def prepare_calendar_data(calendar_df):
-    """
-    Prepare calendar data for storage in Supabase
-    
-    Args:
-        calendar_df (pandas.DataFrame): The raw calendar DataFrame
-        
-    Returns:
-        list: A list of dictionaries with formatted calendar data
-    """
-    calendar_data = []
-    
-    for _, row in calendar_df.iterrows():
-        event_data = {
-            "event_name": row["EventName"],
-            "round": int(row["RoundNumber"]) if pd.notna(row["RoundNumber"]) else None,
-            "country": row["Country"],
-            "location": row["Location"],
-            "circuit_name": row["OfficialEventName"],
-            "event_date": row["EventDate"].isoformat() if pd.notna(row["EventDate"]) else None,
-            "event_format": row["EventFormat"],
-            "session1_name": "Practice 1",
-            "session1_date": row["Session1Date"].isoformat() if pd.notna(row["Session1Date"]) else None,
-            "session2_name": "Practice 2",
-            "session2_date": row["Session2Date"].isoformat() if pd.notna(row["Session2Date"]) else None,
-            "session3_name": "Practice 3",
-            "session3_date": row["Session3Date"].isoformat() if pd.notna(row["Session3Date"]) else None,
-            "session4_name": "Qualifying",
-            "session4_date": row["Session4Date"].isoformat() if pd.notna(row["Session4Date"]) else None,
-            "session5_name": "Race",
-            "session5_date": row["Session5Date"].isoformat() if pd.notna(row["Session5Date"]) else None,
-        }
-        
-        calendar_data.append(event_data)
-    
-    return calendar_data
+# Maximum number of races sent to Supabase per upsert request
+UPSERT_BATCH_SIZE = 500
 
 def store_calendar_in_supabase(calendar_data):
     """
     Store the calendar data in Supabase
     
+    Races are upserted on (round, event_name) and stamped with this run's
+    updated_at; rows the run didn't touch are races dropped from the schedule
+    and are deleted afterwards, so the table mirrors the fetched calendar.
+    
     Args:
         calendar_data (list): List of dictionaries with calendar data
         
     Returns:
-        dict: Response from Supabase
+        list: Supabase response for each upserted batch
     """
     try:
         logger.info("Connecting to Supabase")
         supabase = get_supabase_client()
         
-        # Clear existing data (optional, you might want to update instead)
-        logger.info("Clearing existing calendar data")
-        supabase.table("f1_calendar").delete().execute()
+        # Upsert on (round, event_name) so existing races are updated in place;
+        # round alone repeats for testing events. Batches stay small enough to
+        # fit under the PostgREST payload limit
+        logger.info(f"Upserting {len(calendar_data)} races into Supabase")
+        run_started = datetime.now(timezone.utc).isoformat()
+        responses = []
+        races = ({**race, "updated_at": run_started} for race in calendar_data)
+        while batch := list(islice(races, UPSERT_BATCH_SIZE)):
+            responses.append(
+                supabase.table("f1_calendar").upsert(batch, on_conflict="round,event_name").execute()
+            )
         
-        # Insert new data
-        logger.info(f"Inserting {len(calendar_data)} races into Supabase")
-        response = supabase.table("f1_calendar").insert(calendar_data).execute()
+        # Remove races that are no longer in the schedule; an empty fetch
+        # leaves the table alone rather than wiping it
+        if calendar_data:
+            logger.info("Removing races no longer in the calendar")
+            supabase.table("f1_calendar").delete().lt("updated_at", run_started).execute()
         
         logger.info("Successfully stored calendar data in Supabase")
-        return response
+        return responses
     
     except Exception as e:
         logger.error(f"Error storing calendar data in Supabase: {e}")
@@ -124,6 +69,9 @@ def main():
     try:
         # Fetch calendar data
         calendar_df = fetch_f1_calendar(2025)
+        if calendar_df is None:
+            logger.error("No calendar data available, nothing to do")
+            return
         
         # Prepare data for Supabase
         calendar_data = prepare_calendar_data(calendar_df)
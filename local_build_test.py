@@ -5,7 +5,7 @@ Validation script to test if all dependencies install and work properly
 import sys
 import subprocess
 import importlib
-import pkg_resources
+from importlib.metadata import PackageNotFoundError, version as package_version
 
 def print_header(message):
     print("\n" + "="*80)
@@ -36,12 +36,13 @@ def check_packages():
     
     all_good = True
     for package in required_packages:
+        dist_name = package.replace("dateutil", "python-dateutil")
         try:
             imported = importlib.import_module(package)
-            version = pkg_resources.get_distribution(package.replace("dateutil", "python-dateutil")).version
-            print(f"✅ {package.replace('dateutil', 'python-dateutil')}: {version}")
-        except (ImportError, pkg_resources.DistributionNotFound) as e:
-            print(f"❌ {package.replace('dateutil', 'python-dateutil')} not found: {e}")
+            version = package_version(dist_name)
+            print(f"✅ {dist_name}: {version}")
+        except (ImportError, PackageNotFoundError) as e:
+            print(f"❌ {dist_name} not found: {e}")
             all_good = False
     
     if all_good:
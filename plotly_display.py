@@ -3,10 +3,11 @@
 Script to create interactive visualizations of Formula 1 race calendar data using Plotly.
 """
 
+import argparse
 import logging
-from datetime import datetime
-import fastf1
+from functools import lru_cache
 import pandas as pd
+from f1_data import fetch_f1_calendar, prepare_calendar_data
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -18,72 +19,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def fetch_f1_calendar(year=2025):
-    """
-    Fetch the Formula 1 race calendar for the specified year
-    
-    Args:
-        year (int): The year to fetch the calendar for
-        
-    Returns:
-        pandas.DataFrame: The race calendar data
-    """
-    try:
-        logger.info(f"Fetching F1 calendar for {year}")
-        
-        try:
-            calendar = fastf1.get_event_schedule(year)
-            logger.info(f"Successfully fetched calendar for {year}")
-        except Exception as e:
-            logger.warning(f"Could not fetch {year} calendar: {e}")
-            logger.info("Fetching most recent available calendar instead")
-            
-            current_year = datetime.now().year
-            calendar = fastf1.get_event_schedule(current_year)
-            logger.info(f"Using {current_year} calendar as fallback")
-        
-        return calendar
-    
-    except Exception as e:
-        logger.error(f"Error fetching F1 calendar: {e}")
-        raise
+# write_html options: load plotly.js from the CDN instead of inlining the ~3MB
+# bundle into every file, and never spawn a browser from library code
+HTML_EXPORT_OPTIONS = dict(
+    include_plotlyjs='cdn',
+    full_html=True,
+    validate=False,
+    auto_open=False,
+    config={'responsive': True}
+)
 
-def prepare_calendar_data(calendar_df):
-    """
-    Prepare calendar data for display
-    
-    Args:
-        calendar_df (pandas.DataFrame): The raw calendar DataFrame
-        
-    Returns:
-        list: A list of dictionaries with formatted calendar data
-    """
-    calendar_data = []
-    
-    for _, row in calendar_df.iterrows():
-        event_data = {
-            "event_name": row["EventName"],
-            "round": int(row["RoundNumber"]) if pd.notna(row["RoundNumber"]) else None,
-            "country": row["Country"],
-            "location": row["Location"],
-            "circuit_name": row["OfficialEventName"],
-            "event_date": row["EventDate"].isoformat() if pd.notna(row["EventDate"]) else None,
-            "event_format": row["EventFormat"],
-            "session1_name": "Practice 1",
-            "session1_date": row["Session1Date"].isoformat() if pd.notna(row["Session1Date"]) else None,
-            "session2_name": "Practice 2",
-            "session2_date": row["Session2Date"].isoformat() if pd.notna(row["Session2Date"]) else None,
-            "session3_name": "Practice 3",
-            "session3_date": row["Session3Date"].isoformat() if pd.notna(row["Session3Date"]) else None,
-            "session4_name": "Qualifying",
-            "session4_date": row["Session4Date"].isoformat() if pd.notna(row["Session4Date"]) else None,
-            "session5_name": "Race",
-            "session5_date": row["Session5Date"].isoformat() if pd.notna(row["Session5Date"]) else None,
-        }
-        
-        calendar_data.append(event_data)
-    
-    return calendar_data
+def calendar_key(calendar_data):
+    """Turn a list of race dicts into a hashable key for the figure caches"""
+    return tuple(tuple(race.items()) for race in calendar_data)
 
 def create_interactive_timeline(calendar_data):
     """
@@ -93,10 +41,16 @@ def create_interactive_timeline(calendar_data):
         calendar_data (list): List of dictionaries with calendar data
         
     Returns:
-        None: Saves the visualization as an HTML file
+        plotly.graph_objects.Figure: The timeline figure
     """
+    # Hand out a copy so callers can't change the cached figure
+    return go.Figure(build_interactive_timeline(calendar_key(calendar_data)))
+
+@lru_cache(maxsize=4)
+def build_interactive_timeline(races):
+    """Build the timeline figure for races, a key from calendar_key"""
     # Convert to DataFrame
-    df = pd.DataFrame(calendar_data)
+    df = pd.DataFrame([dict(race) for race in races])
     
     # Convert dates to datetime
     df['event_date'] = pd.to_datetime(df['event_date'])
@@ -104,57 +58,34 @@ def create_interactive_timeline(calendar_data):
     # Sort by event date
     df = df.sort_values('event_date')
     
-    # Create timeline visualization
-    fig = px.scatter(
-        df, 
-        x='event_date', 
-        y='country',
-        color='country',
-        size=[30] * len(df),  # Fixed size for all points
-        hover_name='event_name',
-        hover_data={
-            'event_date': True,
-            'circuit_name': True,
-            'round': True,
-            'country': False,  # Hide duplicate in hover
-            'event_format': True
-        },
-        title=f'Formula 1 Race Calendar {df["event_date"].dt.year.iloc[0]}',
-        labels={
-            'event_date': 'Date',
-            'country': 'Country',
-            'event_name': 'Event',
-            'circuit_name': 'Circuit',
-            'round': 'Round',
-            'event_format': 'Format'
-        }
-    )
-    
-    # Add race names as text labels
-    fig.add_trace(
+    # Markers, race name labels and the connecting line share one trace
+    fig = go.Figure(
         go.Scatter(
             x=df['event_date'],
             y=df['country'],
-            mode='text',
+            mode='lines+markers+text',
+            marker=dict(
+                size=20,
+                color=df['country'].astype('category').cat.codes,
+                colorscale='Reds'
+            ),
+            line=dict(
+                color='rgba(100, 100, 100, 0.2)',
+                width=1
+            ),
             text=df['event_name'],
             textposition='top center',
             textfont=dict(
                 size=10,
                 color='black'
             ),
-            showlegend=False
-        )
-    )
-    
-    # Add lines connecting events
-    fig.add_trace(
-        go.Scatter(
-            x=df['event_date'],
-            y=df['country'],
-            mode='lines',
-            line=dict(
-                color='rgba(100, 100, 100, 0.2)',
-                width=1
+            customdata=df[['event_name', 'circuit_name', 'round', 'event_format']],
+            hovertemplate=(
+                "<b>%{customdata[0]}</b><br>"
+                "Date=%{x}<br>"
+                "Circuit=%{customdata[1]}<br>"
+                "Round=%{customdata[2]}<br>"
+                "Format=%{customdata[3]}<extra></extra>"
             ),
             showlegend=False
         )
@@ -195,12 +126,7 @@ def create_interactive_timeline(calendar_data):
         )
     )
     
-    # Save as HTML
-    fig.write_html('f1_calendar_interactive.html')
-    logger.info("Interactive calendar saved as 'f1_calendar_interactive.html'")
-    
-    # Show figure
-    fig.show()
+    return fig
 
 def create_race_distribution_chart(calendar_data):
     """
@@ -210,13 +136,20 @@ def create_race_distribution_chart(calendar_data):
         calendar_data (list): List of dictionaries with calendar data
         
     Returns:
-        None: Saves the visualization as an HTML file
+        plotly.graph_objects.Figure: The distribution chart
     """
+    # Hand out a copy so callers can't change the cached figure
+    return go.Figure(build_race_distribution_chart(calendar_key(calendar_data)))
+
+@lru_cache(maxsize=4)
+def build_race_distribution_chart(races):
+    """Build the races-by-country bar chart for races, a key from calendar_key"""
     # Convert to DataFrame
-    df = pd.DataFrame(calendar_data)
+    df = pd.DataFrame([dict(race) for race in races])
     
-    # Filter out non-race events
-    df = df[df['round'] is not None and df['round'] > 0]
+    # Filter out non-race events (pre-season testing has no round or round 0)
+    rounds = df['round'].astype('Int64')
+    df = df[rounds.notna() & rounds.gt(0)]
     
     # Count races by country
     country_counts = df['country'].value_counts().reset_index()
@@ -251,27 +184,38 @@ def create_race_distribution_chart(calendar_data):
         )
     )
     
-    # Save as HTML
-    fig.write_html('f1_races_by_country.html')
-    logger.info("Country distribution chart saved as 'f1_races_by_country.html'")
-    
-    # Return figure
     return fig
 
 def main():
     """Main function to create interactive visualizations of F1 calendar data"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--show", action="store_true",
+                        help="also open the timeline in a browser")
+    args = parser.parse_args()
+    
     try:
         # Fetch calendar data
         calendar_df = fetch_f1_calendar(2025)
+        if calendar_df is None:
+            logger.error("No calendar data available, nothing to plot")
+            return
         
         # Prepare data for visualization
         calendar_data = prepare_calendar_data(calendar_df)
         
         # Create interactive timeline
-        create_interactive_timeline(calendar_data)
+        timeline = create_interactive_timeline(calendar_data)
+        timeline.write_html('f1_calendar_interactive.html', **HTML_EXPORT_OPTIONS)
+        logger.info("Interactive calendar saved as 'f1_calendar_interactive.html'")
+        
+        # The HTML file is the output; only open a browser when asked to
+        if args.show:
+            timeline.show()
         
         # Create country distribution chart
-        create_race_distribution_chart(calendar_data)
+        distribution = create_race_distribution_chart(calendar_data)
+        distribution.write_html('f1_races_by_country.html', **HTML_EXPORT_OPTIONS)
+        logger.info("Country distribution chart saved as 'f1_races_by_country.html'")
         
         logger.info("Plotly visualizations completed successfully")
         
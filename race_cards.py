@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+HTML rendering for the race cards shown in the Streamlit calendar view.
+
+Kept free of heavy imports so the calendar data builders can pre-render
+each card into calendar_data.json.
+"""
+
+from functools import lru_cache
+
+# Race status colors and indicators
+STATUS_COLORS = {
+    "Completed": "#4CAF50",  # Green
+    "Ongoing": "#FF9800",    # Orange
+    "Upcoming": "#2196F3"    # Blue
+}
+STATUS_EMOJI = {"Completed": "✅", "Ongoing": "🏎️", "Upcoming": "🔜"}
+
+# Race card HTML, filled in with str.format_map per race
+SPRINT_BADGE_HTML = '<span style="background-color: #F44336; color: white; padding: 2px 6px; border-radius: 4px; font-size: 10px; margin-left: 5px;">SPRINT</span>'
+
+WINNER_TEMPLATE = """
+        <div style="margin-top: 8px; font-size: 14px;">
+            <strong>Winner:</strong> {winner}
+        </div>
+        """
+
+RACE_CARD_TEMPLATE = """
+    <div style="position: relative; border-radius: 8px; border-left: 5px solid {status_color}; 
+                padding: 12px; margin-bottom: 10px; background-color: #f8f9fa; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
+        <div style="position: absolute; top: 10px; right: 10px; background-color: #333; color: white; 
+                    border-radius: 50%; width: 25px; height: 25px; display: flex; align-items: center; 
+                    justify-content: center; font-weight: bold;">
+            {round}
+        </div>
+        <div style="font-size: 16px; font-weight: bold; margin-bottom: 6px;">
+            {name} {sprint_badge}
+        </div>
+        <div style="font-size: 14px; margin-bottom: 4px;">
+            <strong>Date:</strong> {date_formatted}
+        </div>
+        <div style="font-size: 14px; margin-bottom: 4px;">
+            <strong>Location:</strong> {location}, {country}
+        </div>
+        <div style="display: flex; align-items: center; margin-top: 8px;">
+            <span style="background-color: {status_color}; color: white; padding: 2px 8px; border-radius: 4px; font-size: 12px;">
+                {status_emoji} {status}
+            </span>
+        </div>
+        {winner_html}
+    </div>
+    """
+
+def create_race_card_html(race):
+    """Create HTML for a race card"""
+    winner = race.get('winner') or {}
+    
+    return _render_race_card(
+        race['round'],
+        race['name'],
+        race['date_formatted'],
+        race['location'],
+        race['country'],
+        race['status'],
+        race['is_sprint'],
+        winner.get('display')
+    )
+
+@lru_cache(maxsize=64)
+def _render_race_card(round_num, name, date_formatted, location, country, status, is_sprint, winner_display):
+    """Render the race card HTML, memoized on the fields shown on the card"""
+    # Winner info if available
+    winner_html = ""
+    if status == "Completed" and winner_display:
+        winner_html = WINNER_TEMPLATE.format_map({"winner": winner_display})
+    
+    return RACE_CARD_TEMPLATE.format_map({
+        "status_color": STATUS_COLORS.get(status, "#9E9E9E"),  # Grey default
+        "status_emoji": STATUS_EMOJI.get(status, "❓"),
+        "status": status,
+        "round": round_num,
+        "name": name,
+        "sprint_badge": SPRINT_BADGE_HTML if is_sprint else "",
+        "date_formatted": date_formatted,
+        "location": location,
+        "country": country,
+        "winner_html": winner_html
+    })
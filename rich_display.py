@@ -3,19 +3,25 @@
 Script to display Formula 1 race calendar data with Rich formatting.
 """
 
+import argparse
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import json
-import fastf1
+from functools import lru_cache, partial
+from pathlib import Path
+import orjson
+import numpy as np
 import pandas as pd
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
 from rich import box
-from rich.layout import Layout
 from rich.console import Group
 from rich.columns import Columns
+from f1_data import fetch_f1_calendar, get_fastf1
+from race_cards import create_race_card_html
 
 # Configure logging
 logging.basicConfig(
@@ -24,35 +30,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def fetch_f1_calendar(year=2025):
-    """
-    Fetch the Formula 1 race calendar for the specified year
-    
-    Args:
-        year (int): The year to fetch the calendar for
-        
-    Returns:
-        pandas.DataFrame: The race calendar data
-    """
-    try:
-        logger.info(f"Fetching F1 calendar for {year}")
-        
-        try:
-            calendar = fastf1.get_event_schedule(year)
-            logger.info(f"Successfully fetched calendar for {year}")
-        except Exception as e:
-            logger.warning(f"Could not fetch {year} calendar: {e}")
-            logger.info("Fetching most recent available calendar instead")
-            
-            current_year = datetime.now().year
-            calendar = fastf1.get_event_schedule(current_year)
-            logger.info(f"Using {current_year} calendar as fallback")
-        
-        return calendar
-    
-    except Exception as e:
-        logger.error(f"Error fetching F1 calendar: {e}")
-        raise
+# Shared console for all Rich output
+CONSOLE = Console(width=120)
+
+# Rich styles for the Status column of the calendar table
+STATUS_STYLES = {
+    "Completed": "green",
+    "Ongoing": "blue bold",
+    "Upcoming": "yellow"
+}
+
+# Number of race results fetched from FastF1 in parallel
+WINNER_FETCH_WORKERS = 8
+
+# Schedule columns used by prepare_calendar_data, and the low-cardinality
+# string columns among them that are stored as categoricals
+SCHEDULE_COLUMNS = [
+    "RoundNumber", "EventName", "OfficialEventName", "Country",
+    "Location", "CircuitName", "EventDate", "EventFormat"
+]
+CATEGORY_COLUMNS = ["Country", "Location", "EventFormat"]
+
+# Race winners don't change once published, so they're kept on disk between runs
+WINNER_CACHE_PATH = Path(".cache") / "winners.json"
 
 def get_race_status(race_date, simulated_date=None):
     """Determine the status of a race based on date comparison"""
@@ -83,11 +83,69 @@ def get_race_status(race_date, simulated_date=None):
         logger.error(f"Error calculating race status: {e}")
         return "Unknown"
 
-def get_race_winner(year, race_round):
-    """Get the winner of a specific race"""
+def get_race_statuses(event_dates, simulated_date=None):
+    """
+    Vectorized get_race_status over a column of race dates
+    
+    Args:
+        event_dates (pandas.Series): Race dates
+        simulated_date (datetime, optional): Simulated date for testing
+        
+    Returns:
+        numpy.ndarray: Status string for each race
+    """
+    dates = pd.to_datetime(event_dates)
+    today = pd.Timestamp(simulated_date if simulated_date else datetime.now())
+    
+    conditions = [
+        dates.isna(),
+        # Completed only from the day after the race (day+1)
+        dates.dt.normalize() < today.normalize(),
+        # Race weekend runs from 2 days before until a few hours after the race
+        (dates - pd.Timedelta(days=2) <= today) & (today <= dates + pd.Timedelta(hours=6))
+    ]
+    
+    return np.select(conditions, ["Unknown", "Completed", "Ongoing"], default="Upcoming")
+
+@lru_cache(maxsize=1)
+def load_winner_cache():
+    """Load the on-disk race winner cache, keyed by year:round"""
+    try:
+        return orjson.loads(WINNER_CACHE_PATH.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+def save_winner_cache():
+    """Write the race winner cache back to disk through a temporary file"""
+    WINNER_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = WINNER_CACHE_PATH.with_suffix(".tmp")
+    tmp_path.write_bytes(orjson.dumps(load_winner_cache()))
+    os.replace(tmp_path, WINNER_CACHE_PATH)
+
+def get_race_winner(year, race_round, event_date=None):
+    """
+    Get the winner of a specific race
+    
+    Args:
+        year (int): Season year
+        race_round (int): Round number
+        event_date (optional): Race date; results aren't looked up until the
+            day after it, so no session is loaded for races still to come
+    
+    Returns:
+        dict: Winner details, or an empty dict if not available
+    """
+    if event_date is not None and pd.Timestamp(event_date) + pd.Timedelta(days=1) > pd.Timestamp.now():
+        return {}
+    
+    winner_cache = load_winner_cache()
+    cache_key = f"{year}:{race_round}"
+    if cache_key in winner_cache:
+        return winner_cache[cache_key]
+    
     try:
         # Get the race session for this event
-        session = fastf1.get_session(year, race_round, 'Race')
+        session = get_fastf1().get_session(year, race_round, 'Race')
         # Load the session data - minimal data for speed
         session.load(laps=False, telemetry=False, weather=False)
         # Get the results
@@ -99,94 +157,188 @@ def get_race_winner(year, race_round):
             if not winner.empty:
                 driver_code = winner.iloc[0]['Abbreviation']
                 team = winner.iloc[0]['TeamName']
-                return {
+                # Only published results are cached, so missing ones are retried
+                winner_cache[cache_key] = {
                     "driver_code": driver_code,
                     "driver_name": winner.iloc[0]['FullName'],
                     "team": team,
                     "position": "1",
                     "display": f"{driver_code} ({team})"
                 }
+                return winner_cache[cache_key]
         
         return {}
     except Exception as e:
         logger.warning(f"Error fetching race winner: {e}")
         return {}
 
-def prepare_calendar_data(calendar_df, simulated_date=None):
+def write_calendar_json(result, json_path="calendar_data.json"):
     """
-    Prepare calendar data for display
+    Save the calendar data object to disk if its contents changed
+    
+    last_updated is ignored when comparing against the existing file, and the
+    write goes through a temporary file so readers never see a partial file.
+    
+    Args:
+        result (dict): Structured calendar data object
+        json_path (str): Destination file
+    """
+    # Race cards are only read back from the file, so render them just before saving
+    for race in result["races"]:
+        race["card_html"] = create_race_card_html(race)
+    
+    content = {key: value for key, value in result.items() if key != "last_updated"}
+    try:
+        previous = orjson.loads(Path(json_path).read_bytes())
+        previous.pop("last_updated", None)
+        if previous == content:
+            return
+    except (OSError, orjson.JSONDecodeError):
+        pass
+    
+    tmp_path = f"{json_path}.tmp"
+    Path(tmp_path).write_bytes(orjson.dumps(result, default=str))
+    os.replace(tmp_path, json_path)
+
+def fetch_race_winners(calendar_df, simulated_date=None):
+    """
+    Fetch the winners of every completed race
     
     Args:
         calendar_df (pandas.DataFrame): The raw calendar DataFrame
         simulated_date (datetime, optional): Simulated date for testing
         
     Returns:
-        list: A list of dictionaries with formatted calendar data
+        dict: Winner details keyed by round number
     """
-    calendar_data = []
-    winners = {}
+    # Positions of the completed races, straight from the status array
+    completed_idx = np.flatnonzero(get_race_statuses(calendar_df['EventDate'], simulated_date) == 'Completed')
+    if completed_idx.size == 0:
+        return {}
     
-    # Add status based on date
-    calendar_df['Status'] = calendar_df['EventDate'].apply(
-        lambda date: get_race_status(date, simulated_date)
-    )
+    # Session loads are I/O bound, so fetch them concurrently
+    rounds = calendar_df['RoundNumber'].to_numpy()[completed_idx].astype(int).tolist()
+    event_dates = calendar_df['EventDate'].iloc[completed_idx].tolist()
+    cached_count = len(load_winner_cache())
+    with ThreadPoolExecutor(max_workers=WINNER_FETCH_WORKERS) as executor:
+        winners = dict(zip(rounds, executor.map(partial(get_race_winner, 2025), rounds, event_dates)))
+    
+    # Persist any newly published winners in one write
+    if len(load_winner_cache()) > cached_count:
+        save_winner_cache()
     
-    # Get winners for completed races
-    completed_races = calendar_df[calendar_df['Status'] == 'Completed']
-    if not completed_races.empty:
-        for _, race in completed_races.iterrows():
-            try:
-                round_num = race['RoundNumber']
-                winners[round_num] = get_race_winner(2025, round_num)
-            except Exception as e:
-                logger.warning(f"Couldn't fetch winner for Round {round_num}: {e}")
-    
-    for _, row in calendar_df.iterrows():
-        event_date = pd.to_datetime(row['EventDate']) if pd.notna(row['EventDate']) else None
-        round_num = int(row['RoundNumber']) if pd.notna(row['RoundNumber']) else None
+    return winners
+
+def summarize_season(calendar_df, statuses):
+    """
+    Summarize the season for the overview, which doesn't need race winners
+    
+    Args:
+        calendar_df (pandas.DataFrame): The raw calendar DataFrame
+        statuses (array-like): Race status per row, from get_race_statuses
         
-        event_data = {
-            "round": round_num,
-            "name": row["EventName"],
-            "official_name": row["OfficialEventName"],
-            "country": row["Country"],
-            "location": row["Location"],
-            "circuit": row["CircuitName"] if "CircuitName" in row else row["Location"],
-            "date": event_date.strftime('%Y-%m-%d') if event_date else None,
-            "date_formatted": event_date.strftime('%d %b %Y') if event_date else "TBA",
-            "status": row["Status"],
-            "format": row["EventFormat"],
-            "is_sprint": row["EventFormat"] == 'sprint_qualifying',
-            "winner": winners.get(round_num, {})
+    Returns:
+        dict: Season summary
+    """
+    # Season summaries, each from a single pass over its column
+    first_date, last_date = calendar_df['EventDate'].agg(['min', 'max'])
+    has_races = not calendar_df.empty
+    format_counts = calendar_df['EventFormat'].value_counts()
+    
+    return {
+        "year": 2025,
+        "total_races": int((calendar_df['RoundNumber'] > 0).sum()),
+        "first_race_date": first_date.strftime('%Y-%m-%d') if has_races else None,
+        "last_race_date": last_date.strftime('%Y-%m-%d') if has_races else None,
+        "season_span": f"{first_date.strftime('%d %b %Y')} - {last_date.strftime('%d %b %Y')}" if has_races else "TBA",
+        "status_summary": pd.Series(statuses).value_counts().to_dict(),
+        "format_summary": {
+            "conventional": int(format_counts.get('conventional', 0)),
+            "sprint_qualifying": int(format_counts.get('sprint_qualifying', 0))
         }
+    }
+
+def prepare_calendar_data(calendar_df, simulated_date=None, save_json=False, winners=None):
+    """
+    Prepare calendar data for display
+    
+    Args:
+        calendar_df (pandas.DataFrame): The raw calendar DataFrame
+        simulated_date (datetime, optional): Simulated date for testing
+        save_json (bool): Also write the result to calendar_data.json
+        winners (dict, optional): Winners from fetch_race_winners; fetched
+            here when not given, pass {} to leave them out
         
+    Returns:
+        dict: Structured calendar data object
+    """
+    calendar_data = []
+    if winners is None:
+        winners = fetch_race_winners(calendar_df, simulated_date)
+    
+    # Work on a projected copy with categorical strings instead of the full schedule
+    calendar_df = calendar_df[calendar_df.columns.intersection(SCHEDULE_COLUMNS, sort=False)].astype(
+        {column: "category" for column in CATEGORY_COLUMNS}
+    )
+    
+    # Add status based on date
+    calendar_df['Status'] = get_race_statuses(calendar_df['EventDate'], simulated_date)
+    
+    # Build every field column-wise, then emit one dict per race
+    event_dates = pd.to_datetime(calendar_df['EventDate'])
+    today = pd.Timestamp(simulated_date if simulated_date else datetime.now())
+    columns = pd.DataFrame({
+        "round": calendar_df['RoundNumber'].astype('Int64'),
+        "name": calendar_df['EventName'],
+        "official_name": calendar_df['OfficialEventName'],
+        "country": calendar_df['Country'],
+        "location": calendar_df['Location'],
+        "circuit": calendar_df['CircuitName'] if 'CircuitName' in calendar_df.columns else calendar_df['Location'],
+        "date": event_dates.dt.strftime('%Y-%m-%d'),
+        "date_formatted": event_dates.dt.strftime('%d %b %Y').fillna("TBA"),
+        "status": calendar_df['Status'],
+        "format": calendar_df['EventFormat'],
+        "is_sprint": calendar_df['EventFormat'] == 'sprint_qualifying',
+        "days_until": (event_dates.dt.normalize() - today).dt.days.astype('Int64')
+    })
+    
+    # Missing values become None so the records stay JSON serializable
+    columns = columns.astype(object).where(columns.notna(), None)
+    for event_data in columns.to_dict(orient='records'):
+        event_data["winner"] = winners.get(event_data["round"], {})
         calendar_data.append(event_data)
     
+    # Pick out sprint and featured races in a single pass over the race list
+    sprint_races = []
+    next_race = None
+    ongoing_race = None
+    last_completed_race = None
+    for race in calendar_data:
+        if race["is_sprint"]:
+            sprint_races.append(race)
+        
+        status = race["status"]
+        if status == "Upcoming" and next_race is None:
+            next_race = race
+        elif status == "Ongoing" and ongoing_race is None:
+            ongoing_race = race
+        elif status == "Completed" and (last_completed_race is None or race["round"] > last_completed_race["round"]):
+            last_completed_race = race
+    
     # Create the full data object structure
     result = {
-        "season": {
-            "year": 2025,
-            "total_races": len(calendar_df[calendar_df['RoundNumber'] > 0]),
-            "first_race_date": calendar_df['EventDate'].min().strftime('%Y-%m-%d') if not calendar_df.empty else None,
-            "last_race_date": calendar_df['EventDate'].max().strftime('%Y-%m-%d') if not calendar_df.empty else None,
-            "season_span": f"{calendar_df['EventDate'].min().strftime('%d %b %Y')} - {calendar_df['EventDate'].max().strftime('%d %b %Y')}" if not calendar_df.empty else "TBA",
-            "status_summary": calendar_df['Status'].value_counts().to_dict(),
-            "format_summary": {
-                "conventional": len(calendar_df[calendar_df['EventFormat'] == 'conventional']),
-                "sprint_qualifying": len(calendar_df[calendar_df['EventFormat'] == 'sprint_qualifying'])
-            }
-        },
+        "season": summarize_season(calendar_df, calendar_df['Status']),
         "races": calendar_data,
-        "sprint_races": [race for race in calendar_data if race["is_sprint"]],
-        "next_race": next((race for race in calendar_data if race["status"] == "Upcoming"), None),
-        "ongoing_race": next((race for race in calendar_data if race["status"] == "Ongoing"), None),
-        "last_completed_race": next((race for race in sorted(calendar_data, key=lambda x: -x["round"]) if race["status"] == "Completed"), None),
+        "sprint_races": sprint_races,
+        "next_race": next_race,
+        "ongoing_race": ongoing_race,
+        "last_completed_race": last_completed_race,
         "last_updated": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }
     
     # Save to JSON for potential use by other components
-    with open("calendar_data.json", "w") as f:
-        json.dump(result, f, indent=2)
+    if save_json:
+        write_calendar_json(result)
     
     return result
 
@@ -197,45 +349,58 @@ def display_rich_calendar_table(calendar_data):
     Args:
         calendar_data (dict): Calendar data object with races and season info
     """
-    console = Console(width=120)
+    # Render every section with a single print
+    CONSOLE.print(Group(*calendar_header_parts(calendar_data['season']), *calendar_detail_parts(calendar_data)))
+
+def calendar_header_parts(season_info):
+    """
+    Build the title and season overview, which don't depend on race winners
+    
+    Args:
+        season_info (dict): Season summary from summarize_season
+        
+    Returns:
+        list: Rich renderables
+    """
+    parts = []
     
     # Create a beautiful header
     title = Text("Formula 1 Race Calendar", style="bold white on red")
-    subtitle = Text(f"Season {calendar_data['season']['year']}", style="italic")
+    subtitle = Text(f"Season {season_info['year']}", style="italic")
     
-    console.print(Panel(title, subtitle=subtitle, border_style="red", expand=False))
-    console.print()
+    parts.append(Panel(title, subtitle=subtitle, border_style="red", expand=False))
+    parts.append(Text(""))
     
     # Display season overview
-    season_info = calendar_data['season']
     overview = Table(show_header=False, box=box.SIMPLE, expand=True)
     overview.add_column("Stat", style="bright_black", justify="right")
     overview.add_column("Value", style="white bold", justify="left")
     
     overview.add_row("Total Races:", str(season_info['total_races']))
-    overview.add_row("Sprint Races:", str(len(calendar_data['sprint_races'])))
+    overview.add_row("Sprint Races:", str(season_info['format_summary']['sprint_qualifying']))
     overview.add_row("Completed:", str(season_info['status_summary'].get('Completed', 0)))
     overview.add_row("Ongoing:", str(season_info['status_summary'].get('Ongoing', 0)))
     overview.add_row("Upcoming:", str(season_info['status_summary'].get('Upcoming', 0)))
     overview.add_row("Season Span:", season_info['season_span'])
     
-    console.print(Panel(overview, title="Season Overview", border_style="bright_cyan", padding=(1, 2)))
-    console.print()
+    parts.append(Panel(overview, title="Season Overview", border_style="bright_cyan", padding=(1, 2)))
+    parts.append(Text(""))
     
-    # Display featured races
-    featured_races = Layout()
-    featured_races.split_column(
-        Layout(name="title", size=3),
-        Layout(name="races", size=35)
-    )
-    featured_races["races"].split_row(
-        Layout(name="ongoing"),
-        Layout(name="next"),
-        Layout(name="last")
-    )
+    return parts
+
+def calendar_detail_parts(calendar_data):
+    """
+    Build the featured races, the full race table and the footer
     
-    featured_races["title"].update(Text("Featured Races", style="bold white on red", justify="center"))
+    Args:
+        calendar_data (dict): Calendar data object with races and season info
+        
+    Returns:
+        list: Rich renderables
+    """
+    parts = []
     
+    # Featured races
     # Ongoing race
     if calendar_data['ongoing_race']:
         race = calendar_data['ongoing_race']
@@ -254,21 +419,18 @@ def display_rich_calendar_table(calendar_data):
             border_style="blue",
             padding=(1, 2)
         )
-        featured_races["ongoing"].update(ongoing_panel)
     else:
-        featured_races["ongoing"].update(Panel(
+        ongoing_panel = Panel(
             "No races are currently in progress",
             title="🏎️ Ongoing Race",
             border_style="dim blue",
             padding=(1, 2)
-        ))
+        )
     
     # Next race
     if calendar_data['next_race']:
         race = calendar_data['next_race']
-        race_date = datetime.strptime(race['date'], '%Y-%m-%d') if race['date'] else None
-        today = datetime.now()
-        days_until = (race_date - today).days if race_date else None
+        days_until = race.get('days_until')
         
         panel_content = [
             Text(f"Round {race['round']}: {race['name']}", style="bold white"),
@@ -289,14 +451,13 @@ def display_rich_calendar_table(calendar_data):
             border_style="bright_red",
             padding=(1, 2)
         )
-        featured_races["next"].update(next_panel)
     else:
-        featured_races["next"].update(Panel(
+        next_panel = Panel(
             "No upcoming races scheduled",
             title="🔜 Next Race",
             border_style="dim red",
             padding=(1, 2)
-        ))
+        )
     
     # Last completed race
     if calendar_data['last_completed_race']:
@@ -320,21 +481,27 @@ def display_rich_calendar_table(calendar_data):
             border_style="green",
             padding=(1, 2)
         )
-        featured_races["last"].update(last_panel)
     else:
-        featured_races["last"].update(Panel(
+        last_panel = Panel(
             "No races have been completed yet",
             title="✅ Last Completed Race",
             border_style="dim green",
             padding=(1, 2)
-        ))
+        )
     
-    console.print(featured_races)
-    console.print()
+    # Display featured races side by side under a title
+    parts.append(Text("Featured Races", style="bold white on red", justify="center"))
+    parts.append(Text(""))
+    featured_races = Table.grid(expand=True)
+    for _ in range(3):
+        featured_races.add_column(ratio=1)
+    featured_races.add_row(ongoing_panel, next_panel, last_panel)
+    parts.append(featured_races)
+    parts.append(Text(""))
     
     # Create the full race calendar table
-    console.print(Text("Full Race Calendar", style="bold white on red"))
-    console.print()
+    parts.append(Text("Full Race Calendar", style="bold white on red"))
+    parts.append(Text(""))
     
     table = Table(
         show_header=True, 
@@ -363,15 +530,6 @@ def display_rich_calendar_table(calendar_data):
             
         round_num = str(race['round']) if race['round'] is not None else "-"
         
-        # Set status style
-        status_style = ""
-        if race['status'] == "Completed":
-            status_style = "green"
-        elif race['status'] == "Ongoing":
-            status_style = "blue bold"
-        elif race['status'] == "Upcoming":
-            status_style = "yellow"
-        
         # Get winner display if available
         winner_display = race['winner'].get('display', '') if race.get('winner') else ''
         
@@ -382,21 +540,28 @@ def display_rich_calendar_table(calendar_data):
             round_num,
             race['name'],
             race['date_formatted'],
-            Text(race['status'], style=status_style),
+            Text(race['status'], style=STATUS_STYLES.get(race['status'], "")),
             race['circuit'],
             winner_display,
             sprint
         )
     
-    console.print(table)
+    parts.append(table)
     
     # Add footer
-    console.print()
-    console.print(f"Data provided by FastF1 API | Last updated: {calendar_data['last_updated']}", style="dim")
-    console.print("© 2024 | Created with Rich", style="dim")
+    parts.append(Text(""))
+    parts.append(Text(f"Data provided by FastF1 API | Last updated: {calendar_data['last_updated']}", style="dim"))
+    parts.append(Text("© 2024 | Created with Rich", style="dim"))
+    
+    return parts
 
 def main():
     """Main function to fetch and display F1 calendar data with Rich formatting"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--save-json", action="store_true",
+                        help="also write the calendar to calendar_data.json")
+    args = parser.parse_args()
+    
     try:
         # Allow simulating a specific date for testing
         # simulated_date = datetime(2025, 5, 17)  # Example: May 17, 2025
@@ -404,12 +569,24 @@ def main():
         
         # Fetch calendar data
         calendar_df = fetch_f1_calendar(2025)
+        if calendar_df is None:
+            logger.error("No calendar data available, nothing to display")
+            return
         
-        # Prepare data for display with structured format
-        calendar_data = prepare_calendar_data(calendar_df, simulated_date)
+        # Look up race winners in the background and show the header meanwhile,
+        # since it doesn't need them
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            winners = executor.submit(fetch_race_winners, calendar_df, simulated_date)
+            statuses = get_race_statuses(calendar_df['EventDate'], simulated_date)
+            CONSOLE.print(Group(*calendar_header_parts(summarize_season(calendar_df, statuses))))
+            
+            # Prepare data for display with structured format
+            calendar_data = prepare_calendar_data(
+                calendar_df, simulated_date, save_json=args.save_json, winners=winners.result()
+            )
         
-        # Display rich formatted calendar table
-        display_rich_calendar_table(calendar_data)
+        # Display rich formatted featured races and calendar table
+        CONSOLE.print(Group(*calendar_detail_parts(calendar_data)))
         
         logger.info("Rich display completed successfully")
         
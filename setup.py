@@ -17,7 +17,10 @@ setup(
         "supabase>=1.2.0",
         "requests>=2.31.0",
         "python-dateutil>=2.8.2",
-        "tabulate>=0.9.0"
+        "tabulate>=0.9.0",
+        "orjson>=3.9.0",
+        "pyarrow>=14.0.0",
+        "plotly>=5.18.0"
     ],
     python_requires=">=3.10, <3.13",
 ) 
\ No newline at end of file
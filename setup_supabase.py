@@ -26,7 +26,7 @@ def create_f1_calendar_table():
         CREATE TABLE IF NOT EXISTS f1_calendar (
             id SERIAL PRIMARY KEY,
             event_name TEXT NOT NULL,
-            round INT,
+            round INT NOT NULL,
             country TEXT,
             location TEXT,
             circuit_name TEXT,
@@ -43,9 +43,34 @@ def create_f1_calendar_table():
             session5_name TEXT,
             session5_date TIMESTAMP WITH TIME ZONE,
             created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT f1_calendar_round_event_key UNIQUE (round, event_name)
         );
         
+        -- Rows without a round would never conflict on the upsert key and be
+        -- added again by every load, so round is required on older tables too
+        DELETE FROM f1_calendar WHERE round IS NULL;
+        ALTER TABLE f1_calendar ALTER COLUMN round SET NOT NULL;
+        
+        -- Races are upserted on (round, event_name): round alone isn't unique,
+        -- since testing events are round 0 and some seasons hold two tests.
+        -- Tables created before the key was declared get it added here.
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint WHERE conname = 'f1_calendar_round_event_key'
+            ) THEN
+                -- The old loader's delete and insert were separate requests, so two
+                -- overlapping runs could store the same race twice, which
+                -- ADD CONSTRAINT rejects; keep the newest copy of each race
+                DELETE FROM f1_calendar older USING f1_calendar newer
+                    WHERE older.round = newer.round
+                      AND older.event_name = newer.event_name
+                      AND older.id < newer.id;
+                ALTER TABLE f1_calendar ADD CONSTRAINT f1_calendar_round_event_key UNIQUE (round, event_name);
+            END IF;
+        END $$;
+        
         -- Create RLS policy for public read access
         ALTER TABLE f1_calendar ENABLE ROW LEVEL SECURITY;
         
@@ -7,10 +7,20 @@ import os
 import sys
 import streamlit as st
 import pandas as pd
+import numpy as np
 import fastf1
-import json
-import setuptools
+import orjson
+from f1_data import fetch_f1_calendar
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from pathlib import Path
+from race_cards import create_race_card_html
+
+# Circuit details come from FastF1's MultiViewer API module, where available
+try:
+    from fastf1.mvapi import CircuitInfo
+except ImportError:
+    CircuitInfo = None
 
 # Quick health check for deployment environments
 if len(sys.argv) > 1 and sys.argv[1] == "healthcheck":
@@ -28,8 +38,8 @@ st.set_page_config(
     }
 )
 
-# Apply dark theme with minimal custom CSS
-st.markdown("""
+# Dark theme with minimal custom CSS
+APP_CSS = """
 <style>
     /* Force dark mode throughout */
     [data-testid="stSidebar"], .stApp, .stApp > header, .stApp > footer {
@@ -138,28 +148,68 @@ st.markdown("""
         font-family: 'Titillium Web', sans-serif !important;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Apply dark theme
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # ---------- DATA PROCESSING FUNCTIONS ----------
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def fetch_f1_calendar(year=2024):
-    """Fetch F1 calendar data for the specified year"""
-    try:
-        # Try to get calendar data with ergast backend
-        calendar = fastf1.get_event_schedule(year, backend='ergast')
+# A race weekend runs from 2 days before the race (Friday practice) to a
+# few hours after it, to account for the finish time
+RACE_WEEKEND_BEFORE = pd.Timedelta(days=2)
+RACE_WEEKEND_AFTER = pd.Timedelta(hours=6)
+
+# Schedule columns read by prepare_calendar_data; load_f1_calendar keeps only these
+SCHEDULE_COLUMNS = [
+    'RoundNumber', 'EventName', 'OfficialEventName', 'Country', 'Location',
+    'CircuitName', 'EventDate', 'EventFormat'
+]
+
+# calendar_data.json is written with orjson; default=str covers anything
+# else that isn't natively serializable
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Number of race sessions loaded from FastF1 in parallel
+WINNER_FETCH_WORKERS = 8
+
+@st.cache_data(ttl=3600, show_spinner=False)  # Cache for 1 hour
+def load_f1_calendar(year):
+    """
+    Fetch the season schedule through the shared FastF1 helper
+    
+    Args:
+        year (int): The year to fetch the calendar for
         
-        # Check if the returned dataframe is empty
-        if calendar.empty:
-            # Fall back to current year if requested year has no data
-            current_year = datetime.now().year
-            calendar = fastf1.get_event_schedule(current_year, backend='ergast')
-            
-        return calendar
-    except Exception as e:
-        st.error(f"Error fetching F1 calendar: {e}")
-        return pd.DataFrame()  # Return empty DataFrame on error
+    Returns:
+        pandas.DataFrame: The schedule, limited to SCHEDULE_COLUMNS
+    """
+    calendar = fetch_f1_calendar(year=year, backend='ergast')
+    
+    # Raise rather than return so a failed or empty fetch isn't cached for the TTL
+    if calendar is None or calendar.empty:
+        raise LookupError(f"no calendar could be fetched for {year}")
+    
+    # Only cache the columns the app reads, to keep the cached copy small
+    columns = [column for column in SCHEDULE_COLUMNS if column in calendar.columns]
+    return calendar[columns]
+
+@st.cache_data(ttl=86400, show_spinner=False)  # Cache for 24 hours
+def load_event_schedule(year):
+    """Fetch one season's event schedule from FastF1"""
+    return fastf1.get_event_schedule(year)
 
+@st.cache_data(ttl=86400, show_spinner=False)  # Cache for 24 hours
+def load_circuit_keys(year):
+    """Map lowercased locations and event names to circuit keys, first event wins"""
+    schedule = load_event_schedule(year)
+    circuit_keys = {}
+    for column in ('EventName', 'Location'):
+        names = schedule[column].str.lower()
+        circuit_keys.update(zip(names[::-1], schedule['CircuitKey'][::-1]))
+    return circuit_keys
+
+# Misses return None rather than raising, so they are cached for a day too
 @st.cache_data(ttl=86400)  # Cache for 24 hours
 def fetch_circuit_info(circuit_name):
     """
@@ -172,22 +222,22 @@ def fetch_circuit_info(circuit_name):
         dict: Circuit information including corners, marshal lights, marshal sectors, and rotation
     """
     try:
-        # Use the fastf1.mvapi.CircuitInfo class to get circuit details
-        from fastf1.mvapi import CircuitInfo
-        
         # Log the fetch attempt
         print(f"Fetching circuit info for: {circuit_name}")
         
-        # Circuit data is accessed through fastf1 events module
-        circuits = fastf1.get_event_schedule(2024)['CircuitKey']
-        
-        # Find the circuit key for the given circuit name
-        circuit_key = None
-        for idx, key in circuits.items():
-            circuit_data = fastf1.get_event(2024, idx)
-            if circuit_name.lower() in circuit_data.location.lower() or circuit_name.lower() in circuit_data.name.lower():
-                circuit_key = key
-                break
+        # Circuit data is accessed through the (cached) event schedule
+        schedule = load_event_schedule(2024)
+        
+        # Exact location or event names are a dict lookup; otherwise find
+        # the circuit key by partial match in one pass over the schedule
+        search = circuit_name.lower()
+        circuit_key = load_circuit_keys(2024).get(search)
+        if circuit_key is None:
+            matches = (
+                schedule['Location'].str.lower().str.contains(search, regex=False, na=False)
+                | schedule['EventName'].str.lower().str.contains(search, regex=False, na=False)
+            )
+            circuit_key = schedule.loc[matches, 'CircuitKey'].iloc[0] if matches.any() else None
                 
         if not circuit_key:
             print(f"Circuit key not found for: {circuit_name}")
@@ -200,7 +250,7 @@ def fetch_circuit_info(circuit_name):
         except:
             try:
                 # Alternative fetch using raw MVApi object
-                info = fastf1.mvapi.CircuitInfo(
+                info = CircuitInfo(
                     corners=pd.DataFrame(),
                     marshal_lights=pd.DataFrame(),
                     marshal_sectors=pd.DataFrame(),
@@ -228,8 +278,18 @@ def fetch_circuit_info(circuit_name):
         print(f"Error fetching circuit info: {e}")
         return None
 
-def get_race_status(race_date):
-    """Determine the status of a race based on date comparison"""
+def get_race_status(race_date, today=None):
+    """
+    Determine the status of a race based on date comparison
+    
+    Args:
+        race_date: The race date
+        today (datetime, optional): Reference time, defaults to now; pass
+            one shared value when classifying several races
+        
+    Returns:
+        str: "Completed", "Ongoing", "Upcoming" or "Unknown"
+    """
     if race_date is None or pd.isna(race_date):
         return "Unknown"
     
@@ -237,7 +297,8 @@ def get_race_status(race_date):
         if not isinstance(race_date, datetime):
             race_date = pd.to_datetime(race_date)
         
-        today = datetime.now()
+        if today is None:
+            today = datetime.now()
         
         # For race weekend consideration
         race_weekend_start = race_date - timedelta(days=2)
@@ -256,35 +317,81 @@ def get_race_status(race_date):
         st.error(f"Error calculating race status: {e}")
         return "Unknown"
 
+def get_race_statuses(event_dates, today=None):
+    """
+    Vectorized get_race_status over a column of race dates
+    
+    Args:
+        event_dates (pandas.Series): Race dates
+        today (datetime, optional): Reference time, defaults to now
+        
+    Returns:
+        numpy.ndarray: Status string for each race
+    """
+    dates = pd.to_datetime(event_dates)
+    now = pd.Timestamp.now() if today is None else pd.Timestamp(today)
+    
+    conditions = [
+        dates.isna(),
+        # Completed only from the day after the race (day+1)
+        dates.dt.normalize() < now.normalize(),
+        # Race weekend runs from 2 days before until a few hours after the race
+        (dates - RACE_WEEKEND_BEFORE <= now) & (now <= dates + RACE_WEEKEND_AFTER)
+    ]
+    
+    return np.select(conditions, ["Unknown", "Completed", "Ongoing"], default="Upcoming")
+
 def get_race_winner(year, race_round):
     """Get the winner of a specific race"""
     try:
-        # Get the race session for this event
-        session = fastf1.get_session(year, race_round, 'Race')
-        # Load the session data - minimal data for speed
-        session.load(laps=False, telemetry=False, weather=False)
-        # Get the results
-        results = session.results
-        
-        if results is not None and not results.empty:
-            # Winner is the driver with position 1
-            winner = results[results['Position'] == 1]
-            if not winner.empty:
-                driver_code = winner.iloc[0]['Abbreviation']
-                team = winner.iloc[0]['TeamName']
-                return {
-                    "driver_code": driver_code,
-                    "driver_name": winner.iloc[0]['FullName'],
-                    "team": team,
-                    "position": "1",
-                    "display": f"{driver_code} ({team})"
-                }
-        
-        return {}
+        return fetch_race_winner(year, race_round)
     except Exception:
         # Silently fail - winner may not be available yet
         return {}
 
+@st.cache_data(ttl=86400, show_spinner=False)  # Cache for 24 hours
+def fetch_race_winner(year, race_round):
+    """
+    Fetch the winner of a specific race from its FastF1 session
+    
+    Raises when results aren't published yet, so st.cache_data doesn't keep
+    the missing result and the next rerun tries again.
+    """
+    # Get the race session for this event
+    session = fastf1.get_session(year, race_round, 'Race')
+    # Load the session data - minimal data for speed
+    session.load(laps=False, telemetry=False, weather=False)
+    # Get the results
+    results = session.results
+    
+    if results is None or results.empty:
+        raise LookupError(f"No results for {year} round {race_round}")
+    
+    # Winner is the driver with position 1; results normally come sorted by
+    # position, so check the first row before searching the column
+    winner = results.iloc[0]
+    if winner['Position'] != 1:
+        winner = results.loc[results['Position'].idxmin()]
+    if winner['Position'] != 1:
+        raise LookupError(f"No classified winner for {year} round {race_round}")
+    
+    driver_code = winner['Abbreviation']
+    team = winner['TeamName']
+    return {
+        "driver_code": driver_code,
+        "driver_name": winner['FullName'],
+        "team": team,
+        "position": "1",
+        "display": f"{driver_code} ({team})"
+    }
+
+def schedule_fingerprint(calendar_df):
+    """Hash the schedule columns that prepare_calendar_data depends on"""
+    columns = [column for column in SCHEDULE_COLUMNS if column in calendar_df.columns]
+    return int(pd.util.hash_pandas_object(calendar_df[columns], index=False).sum())
+
+# Statuses move with the clock, so the prepared data is only reused for an hour
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs={pd.DataFrame: schedule_fingerprint})
 def prepare_calendar_data(calendar_df):
     """
     Prepare calendar data for display
@@ -298,82 +405,214 @@ def prepare_calendar_data(calendar_df):
     if calendar_df.empty:
         return {}
         
-    calendar_data = []
     winners = {}
-    year = datetime.now().year  # Use current year for race data
+    # Read the clock once so statuses, year and timestamp all agree
+    now = datetime.now()
+    year = now.year  # Use current year for race data
     
     # Add status based on date
-    calendar_df['Status'] = calendar_df['EventDate'].apply(get_race_status)
+    calendar_df['Status'] = get_race_statuses(calendar_df['EventDate'], today=now)
     
     # Get winners for completed races
     completed_races = calendar_df[calendar_df['Status'] == 'Completed']
     if not completed_races.empty:
-        for _, race in completed_races.iterrows():
-            try:
-                round_num = race['RoundNumber']
-                winners[round_num] = get_race_winner(year, round_num)
-            except:
-                pass  # Silently skip if winner data is unavailable
-    
-    for _, row in calendar_df.iterrows():
-        event_date = pd.to_datetime(row['EventDate']) if pd.notna(row['EventDate']) else None
-        round_num = int(row['RoundNumber']) if pd.notna(row['RoundNumber']) else None
-        
-        # Use the official event name for display if available
-        # The FastF1 API uses 'OfficialEventName' for the full race name including sponsors
-        event_name = row['EventName'] if pd.notna(row['EventName']) else ""
-        official_name = row['OfficialEventName'] if 'OfficialEventName' in row and pd.notna(row['OfficialEventName']) else ""
-        
-        # If official name is empty or None, fall back to regular event name
-        display_name = official_name if official_name else event_name
-        
-        event_data = {
-            "round": round_num,
-            "name": display_name,  # Use official name as the primary name for display
-            "short_name": event_name,  # Keep the short name as a backup
-            "country": row["Country"],
-            "location": row["Location"],
-            "circuit": row["CircuitName"] if "CircuitName" in row else row["Location"],
-            "date": event_date.strftime('%Y-%m-%d') if event_date else None,
-            "date_formatted": event_date.strftime('%d %b %Y') if event_date else "TBA",
-            "status": row["Status"],
-            "format": row["EventFormat"],
-            "is_sprint": row["EventFormat"] == 'sprint_qualifying',
-            "winner": winners.get(round_num, {})
-        }
-        
-        calendar_data.append(event_data)
+        # Session loads are I/O bound, so fetch them concurrently;
+        # get_race_winner already returns {} when results are unavailable
+        rounds = completed_races['RoundNumber'].tolist()
+        with ThreadPoolExecutor(max_workers=WINNER_FETCH_WORKERS) as executor:
+            winners = dict(zip(rounds, executor.map(lambda round_num: get_race_winner(year, round_num), rounds)))
+    
+    # Build every field column-wise, then emit one dict per race
+    event_dates = pd.to_datetime(calendar_df['EventDate'])
+    event_names = calendar_df['EventName'].fillna("")
+    
+    # Use the official event name for display if available, falling back to
+    # the regular event name; the FastF1 API uses 'OfficialEventName' for the
+    # full race name including sponsors
+    if 'OfficialEventName' in calendar_df.columns:
+        official_names = calendar_df['OfficialEventName']
+        display_names = official_names.where(official_names.notna() & official_names.ne(""), event_names)
+    else:
+        display_names = event_names
+    
+    columns = pd.DataFrame({
+        "round": calendar_df['RoundNumber'].astype('Int64'),
+        "name": display_names,  # Use official name as the primary name for display
+        "short_name": event_names,  # Keep the short name as a backup
+        "country": calendar_df['Country'],
+        "location": calendar_df['Location'],
+        "circuit": calendar_df['CircuitName'] if 'CircuitName' in calendar_df.columns else calendar_df['Location'],
+        "date": event_dates.dt.strftime('%Y-%m-%d'),
+        "date_formatted": event_dates.dt.strftime('%d %b %Y').fillna("TBA"),
+        "status": calendar_df['Status'],
+        "format": calendar_df['EventFormat'],
+        "is_sprint": calendar_df['EventFormat'] == 'sprint_qualifying'
+    })
+    
+    # Missing values become None so the records stay JSON serializable
+    columns = columns.astype(object).where(columns.notna(), None)
+    calendar_data = [
+        {**event_data, "winner": winners.get(event_data["round"], {})}
+        for event_data in columns.to_dict(orient='records')
+    ]
+    
+    # Season summaries, each from a single pass over its column; the
+    # calendar is known to be non-empty here
+    first_date, last_date = calendar_df['EventDate'].agg(['min', 'max'])
+    format_counts = calendar_df['EventFormat'].value_counts()
+    statuses, status_counts = np.unique(calendar_df['Status'].to_numpy(), return_counts=True)
+    status_summary = dict(zip(statuses.tolist(), status_counts.tolist()))
     
     # Create the full data object structure
     result = {
         "season": {
             "year": year,
-            "total_races": len(calendar_df[calendar_df['RoundNumber'] > 0]),
-            "first_race_date": calendar_df['EventDate'].min().strftime('%Y-%m-%d') if not calendar_df.empty else None,
-            "last_race_date": calendar_df['EventDate'].max().strftime('%Y-%m-%d') if not calendar_df.empty else None,
-            "season_span": f"{calendar_df['EventDate'].min().strftime('%d %b %Y')} - {calendar_df['EventDate'].max().strftime('%d %b %Y')}" if not calendar_df.empty else "TBA",
-            "status_summary": calendar_df['Status'].value_counts().to_dict(),
+            "total_races": (calendar_df['RoundNumber'] > 0).sum(),
+            "first_race_date": first_date.strftime('%Y-%m-%d'),
+            "last_race_date": last_date.strftime('%Y-%m-%d'),
+            "season_span": f"{first_date.strftime('%d %b %Y')} - {last_date.strftime('%d %b %Y')}",
+            "status_summary": status_summary,
             "format_summary": {
-                "conventional": len(calendar_df[calendar_df['EventFormat'] == 'conventional']),
-                "sprint_qualifying": len(calendar_df[calendar_df['EventFormat'] == 'sprint_qualifying'])
+                "conventional": format_counts.get('conventional', 0),
+                "sprint_qualifying": format_counts.get('sprint_qualifying', 0)
             }
         },
         "races": calendar_data,
         "sprint_races": [race for race in calendar_data if race["is_sprint"]],
         "next_race": next((race for race in calendar_data if race["status"] == "Upcoming"), None),
         "ongoing_race": next((race for race in calendar_data if race["status"] == "Ongoing"), None),
-        "last_completed_race": next((race for race in sorted(calendar_data, key=lambda x: -x["round"]) if race["status"] == "Completed"), None),
-        "last_updated": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        # The schedule is in round order, so the last completed race is the first one from the end
+        "last_completed_race": next((race for race in reversed(calendar_data) if race["status"] == "Completed"), None),
+        "last_updated": now.strftime('%Y-%m-%d %H:%M:%S')
     }
     
     # Save to JSON for potential use by other components
-    with open("calendar_data.json", "w") as f:
-        json.dump(result, f, indent=2)
+    write_calendar_json(result)
     
     return result
 
+def write_calendar_json(result, json_path="calendar_data.json"):
+    """
+    Save the calendar data object to disk if its contents changed
+    
+    last_updated is ignored when comparing against the existing file, so it is
+    only rewritten when the calendar itself changes. The write goes through a
+    temporary file so readers never see a partially written JSON document.
+    
+    Args:
+        result (dict): Structured calendar data object
+        json_path (str): Destination file
+    """
+    # Race cards are only read back from the file, so render them just before saving
+    for race in result["races"]:
+        race["card_html"] = create_race_card_html(race)
+    
+    # Compare with the file itself: it is shared by every session, and this runs
+    # inside cached functions where per-session state doesn't belong
+    content = orjson.dumps(
+        {key: value for key, value in result.items() if key != "last_updated"},
+        option=JSON_OPTIONS | orjson.OPT_SORT_KEYS, default=str
+    )
+    try:
+        previous = orjson.loads(Path(json_path).read_bytes())
+        previous.pop("last_updated", None)
+        if orjson.dumps(previous, option=orjson.OPT_SORT_KEYS) == content:
+            return
+    except (OSError, orjson.JSONDecodeError):
+        pass
+    
+    tmp_path = f"{json_path}.tmp"
+    Path(tmp_path).write_bytes(orjson.dumps(result, option=JSON_OPTIONS | orjson.OPT_INDENT_2, default=str))
+    os.replace(tmp_path, json_path)
+
 # ---------- UI COMPONENTS ----------
 
+# Dark mode styling for the calendar table, sent along with the table
+CALENDAR_TABLE_CSS = """
+<style>
+/* Force dark mode for tables */
+.dataframe {
+    background-color: #0E1117 !important;
+    color: #E0E0E0 !important;
+    border-collapse: collapse;
+    width: 100%;
+}
+.dataframe th {
+    background-color: #1E1E1E !important;
+    color: #E0E0E0 !important;
+    font-weight: bold !important;
+    border: 1px solid #333 !important;
+    padding: 8px;
+    text-align: left !important;
+}
+.dataframe td {
+    background-color: #0E1117 !important;
+    color: #E0E0E0 !important;
+    border: 1px solid #333 !important;
+    padding: 8px;
+}
+.dataframe tr:nth-child(even) {
+    background-color: #161B22 !important;
+}
+
+/* Enhanced status styling with indicator dots */
+.completed {
+    background-color: rgba(76, 175, 80, 0.2) !important;
+    border-left: 4px solid #4CAF50 !important;
+    font-weight: bold;
+}
+.ongoing {
+    background-color: rgba(33, 150, 243, 0.2) !important;
+    border-left: 4px solid #2196F3 !important;
+    font-weight: bold;
+}
+.upcoming {
+    background-color: rgba(255, 24, 1, 0.2) !important;
+    border-left: 4px solid #FF1801 !important;
+    font-weight: bold;
+}
+
+/* Status badges fill their cell */
+.status-badge {
+    display: block;
+    padding: 0 4px;
+}
+
+/* Status indicator dots */
+.status-dot {
+    display: inline-block;
+    width: 10px;
+    height: 10px;
+    border-radius: 50%;
+    margin-right: 6px;
+}
+.dot-completed {
+    background-color: #4CAF50;
+}
+.dot-ongoing {
+    background-color: #2196F3;
+}
+.dot-upcoming {
+    background-color: #FF1801;
+}
+
+/* Hide index column */
+.index_col {
+    display: none !important;
+}
+</style>
+"""
+
+# Race statuses as returned by get_race_statuses
+RACE_STATUSES = ["Upcoming", "Ongoing", "Completed", "Unknown"]
+
+# Status badges for the calendar table, with indicator dots; only four
+# values, so render them once
+STATUS_BADGE_HTML = {
+    status: f"<span class='status-badge {status.lower()}'><span class='status-dot dot-{status.lower()}'></span>{status}</span>"
+    for status in RACE_STATUSES
+}
+
 def display_race_card(race, card_type):
     """Display a featured race card with better visual hierarchy."""
     if not race:
@@ -427,61 +666,27 @@ def display_season_overview(calendar_data, season_info):
     # Season overview header
     st.header("Season Overview")
     
-    # Layout with 4 columns
-    col1, col2, col3, col4 = st.columns(4)
-    
     # Calculate metrics - use status_summary or count directly
     completed = season_info['status_summary'].get('Completed', 0)
     upcoming = season_info['status_summary'].get('Upcoming', 0)
     
-    # Display metrics with custom HTML for better styling
-    with col1:
-        st.markdown(
-            f"""
-            <div class="stat-container">
-                <div class="stat-label">Total Races</div>
-                <div class="stat-value">{season_info['total_races']}</div>
-            </div>
-            """, 
-            unsafe_allow_html=True
-        )
+    stats = [
+        ("Total Races", season_info['total_races']),
+        ("Sprint Races", len(calendar_data['sprint_races'])),
+        ("Completed", completed),
+        ("Upcoming", upcoming)
+    ]
+    stat_cards = "".join(
+        f'<div class="stat-container"><div class="stat-label">{label}</div>'
+        f'<div class="stat-value">{value}</div></div>'
+        for label, value in stats
+    )
     
-    with col2:
-        st.markdown(
-            f"""
-            <div class="stat-container">
-                <div class="stat-label">Sprint Races</div>
-                <div class="stat-value">{len(calendar_data['sprint_races'])}</div>
-            </div>
-            """, 
-            unsafe_allow_html=True
-        )
-        
-    with col3:
-        st.markdown(
-            f"""
-            <div class="stat-container">
-                <div class="stat-label">Completed</div>
-                <div class="stat-value">{completed}</div>
-            </div>
-            """, 
-            unsafe_allow_html=True
-        )
-        
-    with col4:
-        st.markdown(
-            f"""
-            <div class="stat-container">
-                <div class="stat-label">Upcoming</div>
-                <div class="stat-value">{upcoming}</div>
-            </div>
-            """, 
-            unsafe_allow_html=True
-        )
-    
-    # Display season span
+    # Display the metrics in a 4 column grid, together with the season span,
+    # as a single element instead of one per column
     st.markdown(
         f"""
+        <div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 16px;">{stat_cards}</div>
         <div style="text-align: center; padding: 20px 0;">
             <p>Season Span: <strong>{season_info['season_span']}</strong></p>
         </div>
@@ -489,10 +694,11 @@ def display_season_overview(calendar_data, season_info):
         unsafe_allow_html=True
     )
 
+@st.cache_data(show_spinner=False)
 def create_calendar_table(races):
     """Create a styled DataFrame for the race calendar"""
-    # Filter out testing events and create a clean DataFrame
-    filtered_races = [race for race in races if race['round'] > 0]
+    # Filter out testing events and sort by round number once, up front
+    filtered_races = sorted((race for race in races if race['round'] > 0), key=lambda race: race['round'])
     
     if not filtered_races:
         return pd.DataFrame()
@@ -500,13 +706,10 @@ def create_calendar_table(races):
     # Create DataFrame with selected columns
     df = pd.DataFrame(filtered_races)
     
-    if df.empty:
-        return pd.DataFrame()
-    
     # Make sure we use the name field which has the official name if available,
     # or falls back to short_name if official name is not available
     # We'll combine the round number with the race name for better display
-    df['formatted_name'] = df.apply(lambda x: f"{x['name'] if x['name'] else x['short_name']}", axis=1)
+    df['formatted_name'] = df['name'].where(df['name'].fillna("").astype(bool), df['short_name'])
     
     # Select and rename columns for display
     display_df = df[['round', 'formatted_name', 'circuit', 'country', 'date_formatted', 'status', 'is_sprint']]
@@ -524,19 +727,40 @@ def create_calendar_table(races):
     display_df['Sprint'] = display_df['Sprint'].map({True: 'Yes', False: 'No'})
     
     # Add winner information for completed races
-    winner_info = []
-    for _, race in df.iterrows():
-        if race['status'] == 'Completed' and race.get('winner'):
-            winner_info.append(race['winner'].get('display', '-'))
-        else:
-            winner_info.append('-')
+    winner_info = df['winner'].map(lambda winner: winner.get('display', '-') if winner else '-')
+    display_df['Winner'] = winner_info.where(df['status'] == 'Completed', '-')
+    
+    return display_df
+
+@st.cache_data(show_spinner=False)
+def render_calendar_table(races, filter_choice):
+    """
+    Render the calendar table HTML for one status filter
     
-    display_df['Winner'] = winner_info
+    Cached per filter, so switching between filters on reruns reuses the
+    already rendered tables.
     
-    # Sort by round number
-    display_df = display_df.sort_values('Round')
+    Args:
+        races (list): Race dicts from prepare_calendar_data
+        filter_choice (str): "All Races" or a race status
+        
+    Returns:
+        str: The table HTML, or "" if no races match the filter
+    """
+    calendar_table = create_calendar_table(races)
     
-    return display_df
+    # Apply filter
+    if filter_choice != "All Races" and not calendar_table.empty:
+        calendar_table = calendar_table[calendar_table['Status'] == filter_choice]
+    
+    if calendar_table.empty:
+        return ""
+    
+    # Format the data with enhanced status display and let pandas
+    # render the table, without the index column
+    return calendar_table.assign(
+        Status=calendar_table['Status'].map(STATUS_BADGE_HTML)
+    ).to_html(escape=False, index=False, border=0)
 
 # ---------- MAIN APP ----------
 
@@ -547,11 +771,11 @@ def main():
     # Fetch and process calendar data - use current year
     with st.spinner("Loading F1 calendar data..."):
         current_year = datetime.now().year
-        calendar_df = fetch_f1_calendar(year=current_year)
-    
-    if calendar_df.empty:
-        st.error("No calendar data available. Please try again later.")
-        return
+        try:
+            calendar_df = load_f1_calendar(current_year)
+        except Exception as e:
+            st.error(f"Error fetching F1 calendar: {e}")
+            return
     
     # Process calendar data
     calendar_data = prepare_calendar_data(calendar_df)
@@ -575,113 +799,18 @@ def main():
     # Full race calendar as a table
     st.header("Full Race Calendar")
     
-    # Create table
-    calendar_table = create_calendar_table(calendar_data['races'])
-    
     # Add filter
     filter_options = ["All Races", "Upcoming", "Ongoing", "Completed"]
     filter_choice = st.selectbox("Filter races by status:", filter_options)
     
-    # Apply filter
-    if filter_choice != "All Races":
-        calendar_table = calendar_table[calendar_table['Status'] == filter_choice]
+    # Render the (cached) table for the chosen filter
+    html_table = render_calendar_table(calendar_data['races'], filter_choice)
     
-    if calendar_table.empty:
+    if not html_table:
         st.warning(f"No races with status '{filter_choice}' found.")
     else:
         # Apply CSS to force dark mode for the table
-        st.markdown("""
-        <style>
-        /* Force dark mode for tables */
-        .dataframe {
-            background-color: #0E1117 !important;
-            color: #E0E0E0 !important;
-            border-collapse: collapse;
-            width: 100%;
-        }
-        .dataframe th {
-            background-color: #1E1E1E !important;
-            color: #E0E0E0 !important;
-            font-weight: bold !important;
-            border: 1px solid #333 !important;
-            padding: 8px;
-            text-align: left;
-        }
-        .dataframe td {
-            background-color: #0E1117 !important;
-            color: #E0E0E0 !important;
-            border: 1px solid #333 !important;
-            padding: 8px;
-        }
-        .dataframe tr:nth-child(even) {
-            background-color: #161B22 !important;
-        }
-        
-        /* Enhanced status styling with indicator dots */
-        .completed {
-            background-color: rgba(76, 175, 80, 0.2) !important;
-            border-left: 4px solid #4CAF50 !important;
-            font-weight: bold;
-        }
-        .ongoing {
-            background-color: rgba(33, 150, 243, 0.2) !important;
-            border-left: 4px solid #2196F3 !important;
-            font-weight: bold;
-        }
-        .upcoming {
-            background-color: rgba(255, 24, 1, 0.2) !important;
-            border-left: 4px solid #FF1801 !important;
-            font-weight: bold;
-        }
-        
-        /* Status indicator dots */
-        .status-dot {
-            display: inline-block;
-            width: 10px;
-            height: 10px;
-            border-radius: 50%;
-            margin-right: 6px;
-        }
-        .dot-completed {
-            background-color: #4CAF50;
-        }
-        .dot-ongoing {
-            background-color: #2196F3;
-        }
-        .dot-upcoming {
-            background-color: #FF1801;
-        }
-        
-        /* Hide index column */
-        .index_col {
-            display: none !important;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-        
-        # Format the data with enhanced status display
-        html_table = "<table class='dataframe'><thead><tr>"
-        
-        # Add headers without index column
-        for col in calendar_table.columns:
-            html_table += f"<th>{col}</th>"
-        
-        html_table += "</tr></thead><tbody>"
-        
-        # Add rows without index column
-        for _, row in calendar_table.iterrows():
-            html_table += "<tr>"
-            for i, col in enumerate(calendar_table.columns):
-                # Special styling for Status column with indicator dots
-                if col == 'Status':
-                    status_class = row[col].lower()
-                    dot_class = f"dot-{status_class}"
-                    html_table += f"<td class='{status_class}'><span class='status-dot {dot_class}'></span>{row[col]}</td>"
-                else:
-                    html_table += f"<td>{row[col]}</td>"
-            html_table += "</tr>"
-        
-        html_table += "</tbody></table>"
+        st.markdown(CALENDAR_TABLE_CSS, unsafe_allow_html=True)
         
         # Display the table
         st.markdown(html_table, unsafe_allow_html=True)
@@ -1,12 +1,24 @@
+import os
 import fastf1
 import pandas as pd
+import numpy as np
 import traceback
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from pathlib import Path
 
 print("FastF1 API Test for 2025 Calendar")
 print("---------------------------------")
 
+# Status indicators for the console table
+STATUS_INDICATORS = {
+    'Completed': '✓',
+    'Ongoing': '▶',
+    'Upcoming': '○',
+    'Unknown': '?'
+}
+
 # Function to determine race status based on date
 def get_race_status(race_date):
     """Determine the status of a race based on date comparison"""
@@ -38,8 +50,58 @@ def get_race_status(race_date):
         print(f"Error calculating race status: {e}")
         return "Unknown"
 
+# Race results never change once published, so winners are kept on disk
+# between runs, in the same year:round cache file rich_display.py uses
+WINNER_CACHE_PATH = Path(".cache") / "winners.json"
+
+def load_winner_cache():
+    """Load the on-disk race winner cache, keyed by year:round"""
+    try:
+        return orjson.loads(WINNER_CACHE_PATH.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+def save_winner_cache(winner_cache):
+    """Write the race winner cache back to disk through a temporary file"""
+    WINNER_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = WINNER_CACHE_PATH.with_suffix(".tmp")
+    tmp_path.write_bytes(orjson.dumps(winner_cache))
+    os.replace(tmp_path, WINNER_CACHE_PATH)
+
+winner_cache = load_winner_cache()
+
+# Function to get every race winner of a season in a single request
+def cache_season_winners(year):
+    try:
+        print(f"  Fetching {year} race winners from Ergast...")
+        from fastf1.ergast import Ergast
+        
+        # Only P1 is requested, so one page holds a whole season
+        response = Ergast().get_race_results(season=year, results_position=1, limit=100)
+        
+        for race_round, results in zip(response.description['round'], response.content):
+            if results.empty:
+                continue
+            
+            winner = results.iloc[0]
+            driver_code = winner['driverCode']
+            team = winner['constructorName']
+            winner_cache[f"{year}:{race_round}"] = {
+                "driver_code": driver_code,
+                "driver_name": f"{winner['givenName']} {winner['familyName']}",
+                "team": team,
+                "position": "1",
+                "display": f"{driver_code} ({team})"
+            }
+    except Exception as e:
+        print(f"  Error fetching season winners: {e}")
+
 # Function to get race winner for completed races
 def get_race_winner(year, race_round):
+    cache_key = f"{year}:{race_round}"
+    if cache_key in winner_cache:
+        return winner_cache[cache_key]
+    
     try:
         print(f"  Fetching results for round {race_round}...")
         # Get the race session for this event
@@ -55,13 +117,15 @@ def get_race_winner(year, race_round):
             if not winner.empty:
                 driver_code = winner.iloc[0]['Abbreviation']
                 team = winner.iloc[0]['TeamName']
-                return {
+                # Only published results are cached, so missing ones are retried
+                winner_cache[cache_key] = {
                     "driver_code": driver_code,
                     "driver_name": winner.iloc[0]['FullName'],
                     "team": team,
                     "position": "1",
                     "display": f"{driver_code} ({team})"
                 }
+                return winner_cache[cache_key]
             
         return {}
     except Exception as e:
@@ -74,6 +138,13 @@ def create_calendar_data_object(calendar_df, winners=None):
     if winners is None:
         winners = {}
     
+    # Fill in the optional schedule columns once, so the fields below can
+    # read every column directly
+    calendar_df = calendar_df.assign(
+        Status=calendar_df.get('Status', "Unknown"),
+        CircuitName=calendar_df.get('CircuitName', calendar_df['Location'])
+    )
+    
     # Overall season data
     first_date = pd.to_datetime(calendar_df['EventDate'].min()) if not calendar_df.empty else None
     last_date = pd.to_datetime(calendar_df['EventDate'].max()) if not calendar_df.empty else None
@@ -84,58 +155,75 @@ def create_calendar_data_object(calendar_df, winners=None):
         "first_race_date": first_date.strftime('%Y-%m-%d') if first_date else None,
         "last_race_date": last_date.strftime('%Y-%m-%d') if last_date else None,
         "season_span": f"{first_date.strftime('%d %b %Y')} - {last_date.strftime('%d %b %Y')}" if first_date and last_date else "TBA",
-        "status_summary": calendar_df['Status'].value_counts().to_dict() if 'Status' in calendar_df.columns else {},
-        "format_summary": calendar_df['EventFormat'].value_counts().to_dict() if 'EventFormat' in calendar_df.columns else {}
+        "status_summary": calendar_df['Status'].value_counts().to_dict(),
+        "format_summary": calendar_df['EventFormat'].value_counts().to_dict()
     }
     
-    # Race details as a list
-    races = []
-    for _, race in calendar_df.iterrows():
-        # Basic race info
-        race_date = pd.to_datetime(race['EventDate']) if pd.notna(race['EventDate']) else None
-        
-        race_data = {
-            "round": int(race['RoundNumber']),
-            "name": race['EventName'],
-            "official_name": race['OfficialEventName'],
-            "country": race['Country'],
-            "location": race['Location'],
-            "circuit": race['CircuitName'] if 'CircuitName' in race.index else race['Location'],
-            "date": race_date.strftime('%Y-%m-%d') if race_date else None,
-            "date_formatted": race_date.strftime('%d %b %Y') if race_date else "TBA",
-            "status": race['Status'] if 'Status' in race.index else "Unknown",
-            "format": race['EventFormat'],
-            "is_sprint": race['EventFormat'] == 'sprint_qualifying',
-            "winner": winners.get(race['RoundNumber'], {})
-        }
-        
-        # Session information if available
-        if 'Session1' in race.index and pd.notna(race['Session1']):
-            sessions = []
-            for i in range(1, 6):  # Up to 5 sessions
-                session_name_key = f'Session{i}'
-                session_date_key = f'Session{i}Date'
-                
-                if session_name_key in race.index and pd.notna(race[session_name_key]):
-                    session_date = pd.to_datetime(race[session_date_key]) if pd.notna(race[session_date_key]) else None
-                    sessions.append({
-                        "name": race[session_name_key],
-                        "date": session_date.strftime('%Y-%m-%d') if session_date else None,
-                        "date_formatted": session_date.strftime('%d %b %Y %H:%M') if session_date else "TBA"
-                    })
+    # Race details as a list, built column-wise and emitted one dict per race
+    event_dates = pd.to_datetime(calendar_df['EventDate'])
+    columns = pd.DataFrame({
+        "round": calendar_df['RoundNumber'].astype(int),
+        "name": calendar_df['EventName'],
+        "official_name": calendar_df['OfficialEventName'],
+        "country": calendar_df['Country'],
+        "location": calendar_df['Location'],
+        "circuit": calendar_df['CircuitName'],
+        "date": event_dates.dt.strftime('%Y-%m-%d'),
+        "date_formatted": event_dates.dt.strftime('%d %b %Y').fillna("TBA"),
+        "status": calendar_df['Status'],
+        "format": calendar_df['EventFormat'],
+        "is_sprint": calendar_df['EventFormat'] == 'sprint_qualifying'
+    })
+    
+    # Missing values become None so the records stay JSON serializable
+    columns = columns.astype(object).where(columns.notna(), None)
+    races = [
+        {**race_data, "winner": winners.get(race_data["round"], {})}
+        for race_data in columns.to_dict(orient='records')
+    ]
+    
+    # Session information if available, formatted one session column at a time
+    if 'Session1' in calendar_df.columns:
+        session_records = []
+        for i in range(1, 6):  # Up to 5 sessions
+            session_name_key = f'Session{i}'
+            session_date_key = f'Session{i}Date'
             
-            race_data["sessions"] = sessions
+            if session_name_key in calendar_df.columns:
+                session_dates = pd.to_datetime(calendar_df[session_date_key])
+                sessions = pd.DataFrame({
+                    "name": calendar_df[session_name_key],
+                    "date": session_dates.dt.strftime('%Y-%m-%d'),
+                    "date_formatted": session_dates.dt.strftime('%d %b %Y %H:%M').fillna("TBA")
+                })
+                session_records.append(sessions.astype(object).where(sessions.notna(), None).to_dict(orient='records'))
         
-        races.append(race_data)
+        for race_data, has_sessions, *race_sessions in zip(races, calendar_df['Session1'].notna(), *session_records):
+            if has_sessions:
+                race_data["sessions"] = [session for session in race_sessions if session["name"] is not None]
+    
+    # Pick out sprint and featured races by position, from masks over the
+    # status and format columns
+    statuses = columns['status'].to_numpy()
+    sprint_idx = np.flatnonzero(columns['is_sprint'].to_numpy(dtype=bool))
+    upcoming_idx = np.flatnonzero(statuses == "Upcoming")
+    ongoing_idx = np.flatnonzero(statuses == "Ongoing")
+    completed_idx = np.flatnonzero(statuses == "Completed")
+    
+    # races are in schedule (round) order, so the first index is the earliest race
+    last_completed_race = None
+    if completed_idx.size:
+        # The completed race with the highest round number
+        last_completed_race = races[completed_idx[np.argmax(columns['round'].to_numpy()[completed_idx])]]
     
     # Full data object
     calendar_data = {
         "season": season_data,
         "races": races,
-        "sprint_races": [race for race in races if race["is_sprint"]],
-        "next_race": next((race for race in races if race["status"] == "Upcoming"), None),
-        "ongoing_race": next((race for race in races if race["status"] == "Ongoing"), None),
-        "last_completed_race": next((race for race in sorted(races, key=lambda x: -x["round"]) if race["status"] == "Completed"), None),
+        "sprint_races": [races[i] for i in sprint_idx],
+        "next_race": races[upcoming_idx[0]] if upcoming_idx.size else None,
+        "ongoing_race": races[ongoing_idx[0]] if ongoing_idx.size else None,
+        "last_completed_race": last_completed_race,
         "last_updated": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }
     
@@ -153,31 +241,22 @@ try:
     simulated_date = datetime(2025, 5, 17)  # May 17, 2025
     print(f"\nSimulated current date: {simulated_date.strftime('%d %b %Y')}")
     
-    # Calculate race status using the simulated date instead of actual current date
-    def get_simulated_status(race_date):
-        if race_date is None or pd.isna(race_date):
-            return "Unknown"
-        
-        try:
-            if not isinstance(race_date, datetime):
-                race_date = pd.to_datetime(race_date)
-            
-            # Use simulated date instead of actual date
-            # Mark as completed only on the day after the race (day+1)
-            race_day_plus_one = race_date + timedelta(days=1)
-            
-            if race_date.date() < simulated_date.date() and race_day_plus_one.date() <= simulated_date.date():
-                return "Completed"
-            elif (race_date - timedelta(days=2)) <= simulated_date <= (race_date + timedelta(hours=6)):
-                return "Ongoing"
-            else:
-                return "Upcoming"
-        except Exception as e:
-            print(f"Error calculating race status: {e}")
-            return "Unknown"
+    # Calculate race status using the simulated date instead of actual current date,
+    # for the whole EventDate column at once
+    event_dates = pd.to_datetime(calendar['EventDate'])
+    simulated_day = pd.Timestamp(simulated_date).normalize()
+    
+    # Mark as completed only on the day after the race (day+1)
+    completed = event_dates.dt.normalize() < simulated_day
+    # Race weekend runs from 2 days before until a few hours after the race
+    ongoing = (event_dates - timedelta(days=2) <= simulated_date) & (simulated_date <= event_dates + timedelta(hours=6))
     
     # Add status to the dataframe using the simulated date
-    calendar['Status'] = calendar['EventDate'].apply(get_simulated_status)
+    calendar['Status'] = np.select(
+        [event_dates.isna(), completed, ongoing],
+        ["Unknown", "Completed", "Ongoing"],
+        default="Upcoming"
+    )
     
     # Count races by status
     status_counts = calendar['Status'].value_counts().to_dict()
@@ -185,14 +264,20 @@ try:
     
     # Fetch race winners for completed races
     print("\nFetching race winners for completed races...")
-    winners = {}
     
     # Get list of completed races
     completed_races = calendar[calendar['Status'] == 'Completed']
     
-    for _, race in completed_races.iterrows():
-        round_num = race['RoundNumber']
-        winners[round_num] = get_race_winner(2025, round_num)
+    # One Ergast request covers every race winner not cached yet
+    rounds = completed_races['RoundNumber'].tolist()
+    if any(f"2025:{round_num}" not in winner_cache for round_num in rounds):
+        cache_season_winners(2025)
+    
+    # Anything still missing falls back to the race sessions; those loads
+    # are I/O bound, so fetch them concurrently
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        winners = dict(zip(rounds, executor.map(lambda round_num: get_race_winner(2025, round_num), rounds)))
+    save_winner_cache(winner_cache)
     
     # Create the comprehensive data object
     print("\nCreating comprehensive data object...")
@@ -229,8 +314,9 @@ try:
     
     # Save the data to JSON file
     print("\nSaving data to calendar_data.json...")
-    with open('calendar_data.json', 'w') as f:
-        json.dump(calendar_data_object, f, indent=2)
+    Path('calendar_data.json').write_bytes(
+        orjson.dumps(calendar_data_object, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    )
     
     print("Data successfully saved and ready for frontend!")
     
@@ -240,28 +326,22 @@ try:
     print("Round | Date       | Grand Prix               | Country        | Location        | Status     | Winner")
     print("--------------------------------------------------------------------------------------------")
     
-    # Print each race on one line with simple formatting
-    for _, race in calendar.iterrows():
-        round_num = race['RoundNumber']
-        event_name = race['EventName']
-        country = race['Country']
-        location = race['Location']
-        status = race['Status']
-        
-        # Format date
-        if pd.notna(race['EventDate']):
-            date_obj = pd.to_datetime(race['EventDate'])
-            date_str = date_obj.strftime('%d %b %Y')
-        else:
-            date_str = 'TBA'
-        
+    # Format all race dates in one pass
+    calendar['DateFormatted'] = pd.to_datetime(calendar['EventDate']).dt.strftime('%d %b %Y').fillna('TBA')
+    
+    # Print each race on one line with simple formatting, reading the
+    # columns once rather than through a Series per row
+    table_rows = zip(
+        calendar['RoundNumber'].tolist(),
+        calendar['DateFormatted'].tolist(),
+        calendar['EventName'].tolist(),
+        calendar['Country'].tolist(),
+        calendar['Location'].tolist(),
+        calendar['Status'].tolist()
+    )
+    for round_num, date_str, event_name, country, location, status in table_rows:
         # Add status indicator
-        status_indicator = {
-            'Completed': '✓',
-            'Ongoing': '▶',
-            'Upcoming': '○',
-            'Unknown': '?'
-        }.get(status, '')
+        status_indicator = STATUS_INDICATORS.get(status, '')
         
         # Get winner for completed races
         winner_display = winners.get(round_num, {}).get('display', "") if status == "Completed" else ""